@@ -0,0 +1,242 @@
+"""Конкурентность лент и страницы поста под ASGI: синхронные
+представления против blog.async_views.
+
+Приложение blogicum.asgi вызывается напрямую из одного цикла событий,
+как это делает uvicorn, без сети и HTTP-парсера: измеряется только
+работа Django. Каждый режим запускается в отдельном процессе с
+blogicum.settings_production и своей базой SQLite, заполненной
+generate_blog_data с одним и тем же зерном. Виртуальные клиенты
+запрашивают главную, категорию, профиль и страницу поста вперемешку;
+для каждого уровня конкурентности печатаются запросы в секунду и
+задержки.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_asgi.py [--concurrency 1 8 32 64]
+        [--seconds 5] [--posts 2000] [--feed-cache] [--json report.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault(
+    'DJANGO_SETTINGS_MODULE', 'blogicum.settings_production'
+)
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+MODES = ('sync', 'async')
+HOST = b'localhost'
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument(
+    '--concurrency', type=int, nargs='+', default=[1, 8, 32, 64]
+)
+parser.add_argument('--seconds', type=float, default=5)
+parser.add_argument('--posts', type=int, default=2000)
+parser.add_argument('--comments', type=int, default=10000)
+parser.add_argument(
+    '--feed-cache', action='store_true',
+    help='Не отключать кеш отрендеренных лент.',
+)
+parser.add_argument('--json', help='Сохранить результат в файл.')
+parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+parser.add_argument('--database', help=argparse.SUPPRESS)
+
+
+def configure(args):
+    """Подменяет базу и режим представлений до django.setup()."""
+    settings.DATABASES['default']['NAME'] = args.database
+    settings.BLOG_DB_REPLICAS = []
+    settings.BLOG_ASYNC_VIEWS = args.mode == 'async'
+    settings.BLOG_WARM_TEMPLATES = False
+    if not args.feed_cache:
+        settings.BLOG_FEED_CACHE_TIMEOUT = 0
+
+
+def collect_urls():
+    from blog.models import Category, Post
+
+    posts = Post.objects.post_published_query()
+    urls = [f'/posts/{pk}/' for pk in posts.values_list('pk', flat=True)]
+    authors = posts.values_list('author__username', flat=True).distinct()
+    slugs = Category.objects.filter(is_published=True).values_list(
+        'slug', flat=True
+    )
+    return {
+        'index': ['/'],
+        'category': [f'/category/{slug}/' for slug in slugs],
+        'profile': [f'/profile/{username}/' for username in authors],
+        'detail': urls,
+    }
+
+
+async def call(application, path):
+    """Один GET через интерфейс ASGI; возвращает код ответа."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', HOST)],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+    status = None
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django ждёт отключения клиента, пока формирует ответ.
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif not message.get('more_body'):
+            finished.set()
+
+    await application(scope, receive, send)
+    return status
+
+
+async def client(application, urls, deadline, rng, latencies, statuses):
+    kinds = list(urls)
+    while time.monotonic() < deadline:
+        kind = rng.choice(kinds)
+        started = time.perf_counter()
+        status = await call(application, rng.choice(urls[kind]))
+        latencies[kind].append(time.perf_counter() - started)
+        statuses[status] += 1
+
+
+def summarize(latencies, seconds):
+    values = sorted(latencies)
+    if len(values) < 2:
+        return {'requests': len(values)}
+    quantiles = statistics.quantiles(values, n=100)
+    return {
+        'requests': len(values),
+        'rps': round(len(values) / seconds, 1),
+        'p50_ms': round(statistics.median(values) * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+async def measure(application, urls, concurrency, seconds):
+    latencies = {kind: [] for kind in urls}
+    statuses = Counter()
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(
+        client(
+            application, urls, deadline, random.Random(number),
+            latencies, statuses,
+        )
+        for number in range(concurrency)
+    ))
+    result = summarize(
+        [value for values in latencies.values() for value in values],
+        seconds,
+    )
+    result['views'] = {
+        kind: summarize(values, seconds)
+        for kind, values in latencies.items()
+    }
+    result['statuses'] = {str(code): n for code, n in statuses.items()}
+    return result
+
+
+def run_mode(args):
+    """Готовит базу и измеряет один режим; выполняется в дочернем
+    процессе.
+    """
+    configure(args)
+    django.setup()
+
+    from django.core.asgi import get_asgi_application
+    from django.core.management import call_command
+    from django.db import connection
+
+    from blog.generator import BlogDataGenerator
+
+    call_command('migrate', verbosity=0)
+    BlogDataGenerator(seed=1).generate(
+        users=50, categories=10, locations=20,
+        posts=args.posts, comments=args.comments,
+    )
+    urls = collect_urls()
+    connection.close()
+
+    application = get_asgi_application()
+    results = {}
+    for concurrency in args.concurrency:
+        # Прогрев: первые запросы компилируют шаблоны.
+        asyncio.run(measure(application, urls, concurrency, 0.5))
+        results[str(concurrency)] = asyncio.run(
+            measure(application, urls, concurrency, args.seconds)
+        )
+    return results
+
+
+def main():
+    args = parser.parse_args()
+    if args.mode:
+        json.dump(run_mode(args), sys.stdout)
+        return
+
+    report = {
+        'seconds': args.seconds,
+        'posts': args.posts,
+        'feed_cache': args.feed_cache,
+        'modes': {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in MODES:
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, *sys.argv[1:],
+                    '--mode', mode,
+                    '--database', str(Path(directory) / f'{mode}.sqlite3'),
+                ],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            report['modes'][mode] = json.loads(output)
+    print(f'{"клиентов":>8} {"режим":>6} {"запр/с":>9} {"p50, мс":>9} '
+          f'{"p99, мс":>9}')
+    for concurrency in map(str, args.concurrency):
+        for mode in MODES:
+            stats = report['modes'][mode][concurrency]
+            print(
+                f'{concurrency:>8} {mode:>6} {stats.get("rps", 0):9.1f} '
+                f'{stats.get("p50_ms", 0):9.2f} {stats.get("p99_ms", 0):9.2f}'
+            )
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2) + '\n',
+            encoding='utf-8',
+        )
+
+
+if __name__ == '__main__':
+    main()
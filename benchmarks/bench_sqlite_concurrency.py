@@ -0,0 +1,229 @@
+"""Пропускная способность чтения SQLite при одновременной записи.
+
+Сравнивает стандартное подключение Django и профиль из
+blogicum.settings_production (WAL, synchronous=NORMAL, mmap, IMMEDIATE,
+постоянные соединения), а также этот профиль с записью через координатор
+из core.writes. Каждый профиль запускается в отдельном процессе со своей
+базой во временном каталоге. Читатели открывают ленту и страницу поста,
+писатели добавляют комментарии, как CommentCreateView: читают пост и
+сохраняют комментарий через run_write, а сигнал обновляет счётчик.
+Зависимость пропускной способности записи от числа писателей видна при
+запуске с разными --writers. Как после HTTP-запроса, соединение после
+каждой операции закрывается, если этого требует CONN_MAX_AGE.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_sqlite_concurrency.py [--readers 8]
+        [--writers 2] [--seconds 10] [--posts 2000] [--json report.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+PROFILES = ('stock', 'tuned', 'coordinated')
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument('--readers', type=int, default=8)
+parser.add_argument('--writers', type=int, default=2)
+parser.add_argument('--seconds', type=float, default=10)
+parser.add_argument('--posts', type=int, default=2000)
+parser.add_argument('--comments', type=int, default=10000)
+parser.add_argument('--json', help='Сохранить результат в файл.')
+parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+parser.add_argument('--database', help=argparse.SUPPRESS)
+
+
+def configure(profile, path):
+    """Подменяет базу default до первого обращения к соединениям."""
+    config = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+    }
+    if profile != 'stock':
+        from blogicum import settings_production
+
+        tuned = settings_production.DATABASES['default']
+        config.update({
+            key: tuned[key]
+            for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')
+        })
+    settings.DATABASES = {'default': config}
+    settings.BLOG_DB_REPLICAS = []
+    settings.QUERY_INSTRUMENTATION = False
+    settings.BLOG_WRITE_COORDINATOR = profile == 'coordinated'
+
+
+class Worker(threading.Thread):
+    def __init__(self, operation, deadline, post_ids, users):
+        super().__init__(daemon=True)
+        self.operation = operation
+        self.deadline = deadline
+        self.post_ids = post_ids
+        self.users = users
+        self.rng = random.Random()
+        self.latencies = []
+        self.errors = Counter()
+
+    def run(self):
+        from django.db import OperationalError, close_old_connections
+
+        try:
+            while time.monotonic() < self.deadline:
+                started = time.perf_counter()
+                # Начало и конец «запроса»: так же поступают обработчики
+                # request_started и request_finished.
+                close_old_connections()
+                try:
+                    self.operation(self)
+                except OperationalError as error:
+                    self.errors[str(error)] += 1
+                else:
+                    self.latencies.append(time.perf_counter() - started)
+                close_old_connections()
+        finally:
+            from django.db import connection
+
+            connection.close()
+
+
+def read(worker):
+    from blog.models import Post
+
+    list(Post.objects.post_published_query()[:10])
+    post = Post.objects.get_post_data(worker.rng.choice(worker.post_ids))
+    list(post.comments.select_related('author')[:20])
+
+
+def write(worker):
+    from blog.models import Comment, Post
+    from core.writes import run_write
+
+    post = Post.objects.get_post_data(worker.rng.choice(worker.post_ids))
+    run_write(
+        Comment.objects.create,
+        post=post,
+        author=worker.rng.choice(worker.users),
+        text='Комментарий под нагрузкой',
+    )
+
+
+def summarize(workers, seconds):
+    latencies = sorted(
+        latency for worker in workers for latency in worker.latencies
+    )
+    errors = sum((worker.errors for worker in workers), Counter())
+    result = {
+        'ops_per_s': round(len(latencies) / seconds, 1),
+        'errors': sum(errors.values()),
+        'error_kinds': dict(errors),
+    }
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100)
+        result.update({
+            'p50_ms': round(statistics.median(latencies) * 1000, 2),
+            'p99_ms': round(quantiles[98] * 1000, 2),
+        })
+    return result
+
+
+def run_profile(args):
+    """Готовит базу профиля и измеряет её; выполняется в дочернем
+    процессе.
+    """
+    configure(args.profile, args.database)
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    from blog.generator import BlogDataGenerator
+    from blog.models import Post, User
+
+    call_command('migrate', verbosity=0)
+    BlogDataGenerator(seed=1).generate(
+        users=50, categories=10, locations=20,
+        posts=args.posts, comments=args.comments,
+    )
+    post_ids = list(
+        Post.objects.post_published_query().values_list('pk', flat=True)
+    )
+    users = list(User.objects.all())
+    connection.close()
+
+    deadline = time.monotonic() + args.seconds
+    readers = [
+        Worker(read, deadline, post_ids, users)
+        for _ in range(args.readers)
+    ]
+    writers = [
+        Worker(write, deadline, post_ids, users)
+        for _ in range(args.writers)
+    ]
+    for worker in readers + writers:
+        worker.start()
+    for worker in readers + writers:
+        worker.join()
+    from core.writes import shutdown
+
+    shutdown()
+    return {
+        'reads': summarize(readers, args.seconds),
+        'writes': summarize(writers, args.seconds),
+    }
+
+
+def main():
+    args = parser.parse_args()
+    if args.profile:
+        json.dump(run_profile(args), sys.stdout)
+        return
+
+    report = {
+        'readers': args.readers,
+        'writers': args.writers,
+        'seconds': args.seconds,
+        'profiles': {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in PROFILES:
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, *sys.argv[1:],
+                    '--profile', profile,
+                    '--database', str(Path(directory) / f'{profile}.sqlite3'),
+                ],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output)
+            report['profiles'][profile] = result
+            for kind in ('reads', 'writes'):
+                stats = result[kind]
+                print(
+                    f'{profile:11} {kind:6} {stats["ops_per_s"]:9.1f} оп/с  '
+                    f'p50 {stats.get("p50_ms", 0):8.2f} мс  '
+                    f'p99 {stats.get("p99_ms", 0):8.2f} мс  '
+                    f'ошибок {stats["errors"]}'
+                )
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2) + '\n',
+            encoding='utf-8',
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Время рендеринга blog/index.html с 10 постами.
+
+Сравнивает загрузчики шаблонов без кеша и с cached.Loader, как в
+blogicum.settings_production, а также cached.Loader с кешем карточек
+постов (BLOG_POST_CARD_CACHE_TIMEOUT). База данных не нужна: посты
+создаются в памяти.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_templates.py [--iterations 500]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.paginator import Paginator  # noqa: E402
+from django.template.backends.django import DjangoTemplates  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from blog.models import Category, Location, Post, User  # noqa: E402
+from constants import PAGINATION_QTY  # noqa: E402
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def make_engine(cached):
+    config = settings.TEMPLATES[0]
+    return DjangoTemplates({
+        'NAME': 'cached' if cached else 'uncached',
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **config['OPTIONS'],
+            'loaders': [('django.template.loaders.cached.Loader', LOADERS)]
+            if cached else LOADERS,
+        },
+    })
+
+
+def make_context():
+    category = Category(
+        pk=1, title='Категория', slug='category', is_published=True
+    )
+    location = Location(pk=1, name='Место', is_published=True)
+    author = User(pk=1, username='author')
+    now = timezone.now()
+    posts = [
+        Post(
+            pk=number,
+            title=f'Пост {number}',
+            text='Текст поста. ' * 50,
+            pub_date=now - timedelta(hours=number),
+            author=author,
+            category=category,
+            location=location,
+            comment_count=number,
+        )
+        for number in range(1, PAGINATION_QTY + 1)
+    ]
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    page_obj = Paginator(posts, PAGINATION_QTY).page(1)
+    return request, {
+        'page_obj': page_obj,
+        'paginator': page_obj.paginator,
+        'object_list': posts,
+        # Кеш фрагмента ленты отключён: измеряется сам рендеринг.
+        'feed_cache': {'timeout': 0, 'key': 'bench', 'alias': 'default'},
+    }
+
+
+def measure(engine, iterations):
+    request, context = make_context()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        template = engine.get_template('blog/index.html')
+        template.render(context, request)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+    modes = (
+        ('без кеша', False, 0),
+        ('cached.Loader', True, 0),
+        ('+ карточки', True, settings.BLOG_POST_CARD_CACHE_TIMEOUT),
+    )
+    for title, cached, card_timeout in modes:
+        settings.BLOG_POST_CARD_CACHE_TIMEOUT = card_timeout
+        timings = measure(make_engine(cached), args.iterations)
+        timings.sort()
+        print(
+            f'{title:>14}: медиана {statistics.median(timings):.2f} мс, '
+            f'p95 {timings[int(len(timings) * 0.95)]:.2f} мс'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Нагрузочные тесты производительности.
+
+Запуск из корня репозитория:
+    pytest benchmarks/ [--bench-posts 100000] [--bench-comments 1000000]
+        [--bench-iterations 50] [--bench-threshold 1.25] [--update-baselines]
+
+Эталонные значения хранятся в benchmarks/baselines.json отдельно для
+каждого объёма данных и записываются только с --update-baselines. Число
+SQL-запросов не зависит от объёма и сравнивается с эталоном любого
+объёма, задержки — только с эталоном того же объёма.
+"""
+import json
+from pathlib import Path
+
+import pytest
+from django.test import Client
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+BATCH_SIZE = 5000
+SEED = 20240812
+# Меняется вместе с генератором данных: задержки, снятые на других
+# данных, не сравниваются.
+DATA_VERSION = "generate_blog_data/1"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-posts", type=int, default=100_000)
+    group.addoption("--bench-comments", type=int, default=1_000_000)
+    group.addoption("--bench-iterations", type=int, default=50)
+    group.addoption(
+        "--bench-threshold", type=float, default=1.25,
+        help="Допустимое отношение задержки к эталону.",
+    )
+    group.addoption(
+        "--update-baselines", action="store_true",
+        help="Перезаписать эталоны измеренными значениями.",
+    )
+
+
+def seed_blog(n_posts, n_comments):
+    from blog.generator import BlogDataGenerator
+
+    BlogDataGenerator(seed=SEED, batch_size=BATCH_SIZE).generate(
+        users=max(n_posts // 100, 10),
+        categories=20,
+        locations=50,
+        posts=n_posts,
+        comments=n_comments,
+    )
+
+
+@pytest.fixture(scope="session")
+def bench_scale(request):
+    return {
+        "data": DATA_VERSION,
+        "posts": request.config.getoption("--bench-posts"),
+        "comments": request.config.getoption("--bench-comments"),
+    }
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker, bench_scale):
+    with django_db_blocker.unblock():
+        seed_blog(bench_scale["posts"], bench_scale["comments"])
+
+
+@pytest.fixture(autouse=True)
+def uncached_feeds(settings):
+    """Измеряется работа с базой, а не попадание в кеш лент."""
+    settings.DEBUG = False
+    settings.BLOG_FEED_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture
+def bench_client(db):
+    from blog.models import Post
+
+    author = Post.objects.filter(is_published=True).first().author
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+def scale_key(scale):
+    return f"{scale['data']}:{scale['posts']}:{scale['comments']}"
+
+
+class Baselines:
+    def __init__(self, config, scale):
+        self.key = scale_key(scale)
+        self.threshold = config.getoption("--bench-threshold")
+        self.update = config.getoption("--update-baselines")
+        self.data = (
+            json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+            if BASELINES_PATH.exists() else {}
+        )
+
+    def find(self, name):
+        """Эталон этого объёма и, если его нет, эталон любого другого."""
+        same = self.data.get(self.key, {}).get(name)
+        if same is not None:
+            return same, True
+        other = next(
+            (views[name] for views in self.data.values() if name in views),
+            None,
+        )
+        return other, False
+
+    def check(self, name, measured):
+        if self.update:
+            self.data.setdefault(self.key, {})[name] = measured
+            return
+        baseline, same_scale = self.find(name)
+        if baseline is None:
+            pytest.skip(
+                f"{name}: эталона нет, запустите с --update-baselines."
+            )
+        assert measured["queries"] <= baseline["queries"], (
+            f"{name}: {measured['queries']} SQL-запросов, эталон —"
+            f" {baseline['queries']}."
+        )
+        if not same_scale:
+            return
+        for key in ("p50_ms", "p95_ms"):
+            limit = baseline[key] * self.threshold
+            assert measured[key] <= limit, (
+                f"{name}: {key} = {measured[key]:.2f} мс, допустимо"
+                f" {limit:.2f} мс (эталон {baseline[key]:.2f} мс)."
+            )
+
+    def save(self):
+        if not self.update:
+            return
+        BASELINES_PATH.write_text(
+            json.dumps(self.data, ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+
+
+@pytest.fixture(scope="session")
+def baselines(request, bench_scale):
+    baselines = Baselines(request.config, bench_scale)
+    yield baselines
+    baselines.save()
@@ -0,0 +1,400 @@
+"""Нагрузочный тест запущенного сервера блога.
+
+Виртуальные пользователи по очереди выполняют сценарии, похожие на
+живой трафик: анонимный просмотр лент, чтение постов, комментирование и
+редактирование своих постов. Клиент — собственный асинхронный HTTP/1.1
+на asyncio с keep-alive, без сторонних зависимостей. Адреса для запросов
+берутся из той же базы, с которой работает сервер; у авторов должен быть
+общий пароль, как у данных из generate_blog_data.
+
+Отчёт в JSON содержит пропускную способность, долю ошибок и перцентили
+задержек по имени маршрута из blog/urls.py. С --compare печатается
+разница с отчётом прошлой версии.
+
+Запуск из корня репозитория:
+    python blogicum/manage.py runserver --noreload
+    python benchmarks/loadtest.py [--url http://127.0.0.1:8000]
+        [--duration 30] [--concurrency 20]
+        [--mix browse=55,read=35,comment=5,edit=5]
+        [--report loadtest.json] [--compare previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.urls import Resolver404, resolve  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from blog.models import Category, Post  # noqa: E402
+
+DEFAULT_MIX = 'browse=55,read=35,comment=5,edit=5'
+PERCENTILES = (50, 90, 95, 99)
+TARGETS_LIMIT = 1000
+
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    """Одно keep-alive соединение HTTP/1.1."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers, body=b''):
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        lines.append(f'Content-Length: {len(body)}')
+        data = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+        # Сервер может закрыть простаивающее соединение: тогда запрос
+        # повторяется один раз в новом соединении.
+        for retry in (True, False):
+            reused = self.writer is not None
+            if not reused:
+                self.reader, self.writer = await asyncio.open_connection(
+                    self.host, self.port
+                )
+            try:
+                self.writer.write(data)
+                await self.writer.drain()
+                return await self.read_response()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                await self.close()
+                if not (reused and retry):
+                    raise
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Сервер закрыл соединение.')
+        status = int(status_line.split()[1])
+        headers = []
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers.append((name.strip().lower(), value.strip()))
+        fields = dict(headers)
+        if fields.get('transfer-encoding') == 'chunked':
+            body = b''
+            while size := int((await self.reader.readline()).strip(), 16):
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+        else:
+            length = int(fields.get('content-length', 0))
+            body = await self.reader.readexactly(length)
+        if fields.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class VirtualUser:
+    """Клиент с собственными соединением и cookie."""
+
+    def __init__(self, base_url, stats):
+        parts = urlsplit(base_url)
+        self.origin = f'{parts.scheme}://{parts.netloc}'
+        self.connection = Connection(parts.hostname, parts.port or 80)
+        self.cookies = {}
+        self.stats = stats
+        self.username = None
+
+    async def get(self, path, expect=(200,)):
+        return await self.send('GET', path, expect=expect)
+
+    async def post(self, path, data, expect=(302,)):
+        data = {'csrfmiddlewaretoken': self.cookies.get('csrftoken', ''),
+                **data}
+        return await self.send(
+            'POST', path, urlencode(data).encode(), expect,
+            content_type='application/x-www-form-urlencoded',
+        )
+
+    async def send(self, method, path, body=b'', expect=(200,),
+                   content_type=None):
+        headers = {'Referer': self.origin + path}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            )
+        if content_type:
+            headers['Content-Type'] = content_type
+        started = time.perf_counter()
+        try:
+            status, response_headers, _ = await self.connection.request(
+                method, path, headers, body
+            )
+        except (OSError, ValueError, asyncio.IncompleteReadError) as error:
+            elapsed = time.perf_counter() - started
+            self.stats.record(method, path, None, elapsed, failed=True)
+            raise HttpError(f'{method} {path}: {error}') from error
+        elapsed = time.perf_counter() - started
+        self.stats.record(
+            method, path, status, elapsed, failed=status not in expect
+        )
+        for name, value in response_headers:
+            if name == 'set-cookie':
+                for morsel in SimpleCookie(value).values():
+                    self.cookies[morsel.key] = morsel.value
+        if status not in expect:
+            raise HttpError(f'{method} {path}: {status}')
+        return status
+
+    async def login(self, username, password):
+        if self.username == username:
+            return
+        self.cookies.clear()
+        await self.get('/auth/login/')
+        await self.post(
+            '/auth/login/', {'username': username, 'password': password}
+        )
+        self.username = username
+
+
+class Stats:
+    """Задержки и коды ответов по имени маршрута."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.names = {}
+
+    def route_name(self, method, path):
+        path = path.split('?', 1)[0]
+        if path not in self.names:
+            try:
+                self.names[path] = resolve(path).view_name
+            except Resolver404:
+                self.names[path] = 'unresolved'
+        return f'{method} {self.names[path]}'
+
+    def record(self, method, path, status, seconds, failed):
+        """Учитывает ответ; failed — код не тот, что ждал сценарий."""
+        name = self.route_name(method, path)
+        self.latencies[name].append(seconds * 1000)
+        self.statuses[name][str(status or 'error')] += 1
+        if failed:
+            self.errors[name] += 1
+
+    def report(self, elapsed):
+        views = {}
+        for name, timings in sorted(self.latencies.items()):
+            timings.sort()
+            views[name] = {
+                'requests': len(timings),
+                'errors': self.errors[name],
+                'error_rate': round(self.errors[name] / len(timings), 4),
+                **{
+                    f'p{percentile}_ms': round(
+                        timings[min(len(timings) - 1,
+                                    len(timings) * percentile // 100)], 2
+                    )
+                    for percentile in PERCENTILES
+                },
+                'max_ms': round(timings[-1], 2),
+                'statuses': dict(sorted(self.statuses[name].items())),
+            }
+        total = sum(view['requests'] for view in views.values())
+        errors = sum(view['errors'] for view in views.values())
+        return {
+            'duration_s': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'views': views,
+        }
+
+
+class Targets:
+    """Адреса и авторы для сценариев, выбранные из базы."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        posts = Post.objects.post_published_query()
+        self.post_ids = list(
+            posts.values_list('pk', flat=True)[:TARGETS_LIMIT]
+        )
+        self.categories = list(Category.objects.filter(
+            is_published=True
+        ).values_list('slug', flat=True)[:TARGETS_LIMIT])
+        self.authors = list(posts.values_list(
+            'author__username', flat=True
+        ).distinct()[:TARGETS_LIMIT])
+        self.pages = max(1, min(posts.count() // 10, 50))
+        if not (self.post_ids and self.categories and self.authors):
+            raise SystemExit(
+                'В базе нет опубликованных постов: заполните её командой '
+                'generate_blog_data.'
+            )
+
+    def editable_post(self):
+        """Случайный пост автора и данные формы его редактирования."""
+        post = Post.objects.select_related('author').get(
+            pk=self.rng.choice(self.post_ids)
+        )
+        form = {
+            'title': post.title,
+            'text': post.text,
+            'pub_date': timezone.localtime(post.pub_date).strftime(
+                '%Y-%m-%dT%H:%M'
+            ),
+            'category': post.category_id or '',
+            'location': post.location_id or '',
+        }
+        if post.is_published:
+            form['is_published'] = 'on'
+        return post, form
+
+
+async def browse(user, targets, options):
+    rng = targets.rng
+    await user.get(f'/?page={rng.randint(1, targets.pages)}')
+    await user.get(f'/category/{rng.choice(targets.categories)}/')
+    await user.get(f'/profile/{rng.choice(targets.authors)}/')
+
+
+async def read(user, targets, options):
+    post_id = targets.rng.choice(targets.post_ids)
+    await user.get(f'/posts/{post_id}/')
+
+
+async def comment(user, targets, options):
+    await user.login(targets.rng.choice(targets.authors), options.password)
+    post_id = targets.rng.choice(targets.post_ids)
+    await user.get(f'/posts/{post_id}/')
+    await user.post(
+        f'/posts/{post_id}/comment/', {'text': 'Комментарий под нагрузкой'}
+    )
+
+
+async def edit(user, targets, options):
+    post, form = await asyncio.to_thread(targets.editable_post)
+    await user.login(post.author.username, options.password)
+    await user.get(f'/posts/{post.pk}/edit/')
+    await user.post(f'/posts/{post.pk}/edit/', form)
+
+
+SCENARIOS = {
+    'browse': browse,
+    'read': read,
+    'comment': comment,
+    'edit': edit,
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f'Неизвестный сценарий {name}.')
+        mix[name] = float(weight)
+    return mix
+
+
+async def run_user(user, targets, options, deadline):
+    names = list(options.mix)
+    weights = list(options.mix.values())
+    while time.monotonic() < deadline:
+        scenario = SCENARIOS[targets.rng.choices(names, weights)[0]]
+        try:
+            await scenario(user, targets, options)
+        except HttpError:
+            # Ошибка уже учтена в статистике; сценарий начинается заново.
+            user.username = None
+    await user.connection.close()
+
+
+async def run(options):
+    rng = random.Random(options.seed)
+    targets = await asyncio.to_thread(Targets, rng)
+    stats = Stats()
+    started = time.monotonic()
+    deadline = started + options.duration
+    await asyncio.gather(*(
+        run_user(VirtualUser(options.url, stats), targets, options, deadline)
+        for _ in range(options.concurrency)
+    ))
+    report = stats.report(time.monotonic() - started)
+    report['config'] = {
+        'url': options.url,
+        'duration': options.duration,
+        'concurrency': options.concurrency,
+        'mix': options.mix,
+        'seed': options.seed,
+    }
+    return report
+
+
+def compare(report, previous):
+    print(f'{"маршрут":32} {"p50, мс":>18} {"p95, мс":>18} {"ошибки":>14}')
+    for name, view in report['views'].items():
+        old = previous['views'].get(name)
+        if old is None:
+            print(f'{name:32} {"новый маршрут":>18}')
+            continue
+        print(
+            f'{name:32}'
+            f' {old["p50_ms"]:>8.1f} → {view["p50_ms"]:<8.1f}'
+            f' {old["p95_ms"]:>8.1f} → {view["p95_ms"]:<8.1f}'
+            f' {old["error_rate"]:>6.2%} → {view["error_rate"]:<6.2%}'
+        )
+    print(
+        f'Пропускная способность: {previous["throughput_rps"]} → '
+        f'{report["throughput_rps"]} запросов/с'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', type=Path)
+    parser.add_argument('--compare', type=Path)
+    options = parser.parse_args()
+
+    report = asyncio.run(run(options))
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+    if options.report:
+        options.report.write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+    print(
+        f'{report["requests"]} запросов за {report["duration_s"]} с: '
+        f'{report["throughput_rps"]} запросов/с, '
+        f'ошибок {report["error_rate"]:.2%}',
+        file=sys.stderr,
+    )
+    if options.compare:
+        compare(report, json.loads(options.compare.read_text('utf-8')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import statistics
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Category, Post
+from constants import PAGINATION_QTY
+
+
+def measure(request_func, iterations):
+    """Число SQL-запросов одного запроса и задержки в миллисекундах."""
+    request_func()
+    with CaptureQueriesContext(connection) as queries:
+        response = request_func()
+    # Журнал запросов очищается в начале каждого запроса, поэтому
+    # число запросов нужно взять до следующих замеров.
+    query_count = len(queries)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        request_func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "queries": query_count,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+@pytest.fixture
+def targets():
+    post = Post.objects.post_published_query().order_by("comment_count").last()
+    category = Category.objects.filter(is_published=True).first()
+    last_page = Post.objects.post_published_query().count() // PAGINATION_QTY
+    return {"post": post, "category": category, "last_page": last_page}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "name, url",
+    [
+        ("index", lambda t: "/"),
+        ("index_last_page", lambda t: f"/?page={t['last_page']}"),
+        ("category", lambda t: f"/category/{t['category'].slug}/"),
+        ("profile", lambda t: f"/profile/{t['post'].author.username}/"),
+        ("detail", lambda t: f"/posts/{t['post'].pk}/"),
+    ],
+)
+def test_read_view_performance(
+        request, name, url, targets, bench_client, baselines):
+    address = url(targets)
+    measured = measure(
+        lambda: bench_client.get(address),
+        request.config.getoption("--bench-iterations"),
+    )
+    baselines.check(name, measured)
+
+
+@pytest.mark.django_db
+def test_comment_create_performance(
+        request, targets, bench_client, baselines):
+    address = f"/posts/{targets['post'].pk}/comment/"
+    measured = measure(
+        lambda: bench_client.post(address, {"text": "Комментарий"}),
+        request.config.getoption("--bench-iterations"),
+    )
+    baselines.check("comment_create", measured)
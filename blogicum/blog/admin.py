@@ -1,6 +1,10 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Category, Comment, Location, Post
+from .cache import mark_content_changed
+from .models import (
+    Category, Comment, CommentDigest, Location, OutgoingEmail, Post
+)
 
 
 admin.site.empty_value_display = ' - '
@@ -10,6 +14,28 @@ admin.site.empty_value_display = ' - '
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('title', 'is_published')
     list_editable = ('is_published',)
+    actions = ('publish', 'unpublish')
+
+    @admin.action(description='Опубликовать выбранные категории')
+    def publish(self, request, queryset):
+        self.set_published(request, queryset, True)
+
+    @admin.action(description='Снять выбранные категории с публикации')
+    def unpublish(self, request, queryset):
+        self.set_published(request, queryset, False)
+
+    def set_published(self, request, queryset, is_published):
+        """Меняет публикацию категорий и видимость их постов двумя
+        запросами, без сохранения каждой категории.
+        """
+        pks = list(queryset.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = Category.objects.filter(pk__in=pks).update(
+                is_published=is_published
+            )
+            Post.objects.refresh_visibility(category__in=pks)
+            mark_content_changed()
+        self.message_user(request, f'Изменено категорий: {updated}')
 
 
 @admin.register(Location)
@@ -20,7 +46,9 @@ class LocationAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'category', 'is_published')
+    list_display = (
+        'title', 'author', 'category', 'comment_count', 'is_published'
+    )
     list_editable = ('is_published',)
 
 
@@ -28,3 +56,16 @@ class PostAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'post', 'is_published')
     list_editable = ('is_published',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'recipient', 'subject', 'created_at', 'attempts', 'sent_at'
+    )
+    list_filter = ('sent_at',)
+
+
+@admin.register(CommentDigest)
+class CommentDigestAdmin(admin.ModelAdmin):
+    list_display = ('author', 'last_sent_at')
@@ -0,0 +1,229 @@
+"""Асинхронные представления лент и страницы поста.
+
+Подключаются вместо представлений из blog.views при
+BLOG_ASYNC_VIEWS = True и имеют смысл под ASGI: синхронное представление
+там целиком выполняется в потоке, а здесь в поток уходят только запросы
+к базе через асинхронный API ORM. Шаблоны Django рендерятся синхронно,
+поэтому рендеринг идёт в цикле событий, а всё, что читает шаблон,
+загружается заранее: ленивый запрос к базе из шаблона в асинхронном
+контексте вызовет SynchronousOnlyOperation.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.safestring import mark_safe
+from django.views import View
+
+from blog.cache import feed_cache_key
+from blog.forms import CommentForm
+from blog.models import Category, Post
+from constants import PAGINATION_QTY
+from core.mixins import (
+    CONDITIONAL_HEADERS,
+    CommentsPageMixin,
+    ConditionalGetMixin,
+    PostDetailQuerySetMixin,
+    PostQuerySetMixin,
+)
+from core.paginators import InvalidCursor, KeysetPaginator
+
+User = get_user_model()
+
+
+class AsyncReadView(ConditionalGetMixin, View):
+    """Страница только для чтения с ответом 304 на условный GET."""
+
+    template_name = None
+
+    async def get(self, request, *args, **kwargs):
+        # Шаблоны и проверки ниже обращаются к request.user синхронно.
+        request.user = await request.auser()
+        if any(name in request.headers for name in CONDITIONAL_HEADERS):
+            await self.aget_content_change()
+            etag, last_modified = self.get_conditional_state(request)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is not None:
+                return self.patch_conditional_headers(
+                    request, response, etag, last_modified
+                )
+        await self.prepare()
+        response = await self.render()
+        await self.aget_content_change()
+        etag, last_modified = self.get_conditional_state(request)
+        return self.patch_conditional_headers(
+            request, response, etag, last_modified
+        )
+
+    async def prepare(self):
+        """Загружает объекты, от которых зависит страница."""
+
+    async def get_context_data(self):
+        return {"view": self}
+
+    async def render(self):
+        context = await self.get_context_data()
+        return HttpResponse(
+            render_to_string(self.template_name, context, self.request)
+        )
+
+
+class AsyncFeedView(AsyncReadView):
+    """Лента постов с постраничной или курсорной пагинацией."""
+
+    paginate_by = PAGINATION_QTY
+    keyset_ordering = ("-pub_date", "-pk")
+
+    def get_queryset(self):
+        return Post.objects.post_published_query()
+
+    def get_feed_scope(self):
+        return "public"
+
+    async def prepare(self):
+        # Отметка читается раньше данных ленты, как в FeedCacheMixin.
+        await self.aget_content_change()
+
+    async def get_context_data(self):
+        context = await super().get_context_data()
+        feed_cache = {
+            "alias": settings.BLOG_FEED_CACHE_ALIAS,
+            "timeout": settings.BLOG_FEED_CACHE_TIMEOUT,
+            "key": feed_cache_key(
+                self.request,
+                self.get_feed_scope(),
+                self.content_change[0],
+            ),
+        }
+        context["feed_cache"] = feed_cache
+        # Закешированная лента подставляется готовой: тег cache в шаблоне
+        # мог бы не найти её, если срок хранения истечёт до рендеринга, и
+        # отрисовал бы ленту без загруженных постов.
+        feed_html = self.get_cached_feed(feed_cache)
+        if feed_html is not None:
+            context["feed_html"] = mark_safe(feed_html)
+            return context
+        paginator, page = await self.paginate(self.get_queryset())
+        context.update({
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": page.object_list,
+        })
+        return context
+
+    def get_cached_feed(self, feed_cache):
+        if not feed_cache["timeout"]:
+            return None
+        key = make_template_fragment_key("feed", [feed_cache["key"]])
+        return caches[feed_cache["alias"]].get(key)
+
+    async def paginate(self, queryset):
+        """Страница ленты, как у ListView, с заранее выполненными
+        запросами.
+        """
+        if settings.BLOG_FEED_PAGINATION == "keyset":
+            paginator = KeysetPaginator(
+                queryset, self.paginate_by, self.keyset_ordering
+            )
+            try:
+                page = await paginator.apage(self.request.GET.get("cursor"))
+            except InvalidCursor:
+                raise Http404("Некорректный курсор страницы.")
+            return paginator, page
+        paginator = Paginator(queryset, self.paginate_by)
+        # count — cached_property: шаблон получит уже посчитанное значение.
+        paginator.count = await queryset.acount()
+        number = self.request.GET.get("page") or 1
+        if number == "last":
+            number = paginator.num_pages
+        try:
+            page = paginator.page(number)
+        except InvalidPage as error:
+            raise Http404(str(error))
+        page.object_list = [post async for post in page.object_list]
+        return paginator, page
+
+
+class AsyncMainPostsView(AsyncFeedView):
+    """Главная страница с постами."""
+
+    template_name = "blog/index.html"
+    query_budget = 5
+
+
+class AsyncCategoryPostsView(AsyncMainPostsView):
+    """Страница со списком постов выбранной категории."""
+
+    template_name = "blog/category.html"
+    query_budget = 6
+
+    async def prepare(self):
+        await super().prepare()
+        self.category = await aget_object_or_404(
+            Category, slug=self.kwargs["category_slug"], is_published=True
+        )
+
+    def get_queryset(self):
+        return super().get_queryset().filter(category=self.category)
+
+    async def get_context_data(self):
+        context = await super().get_context_data()
+        context["category"] = self.category
+        return context
+
+
+class AsyncUserProfileView(PostQuerySetMixin, AsyncFeedView):
+    """Страница с информацией о пользователе и списком его публикаций."""
+
+    template_name = "blog/profile.html"
+    query_budget = 6
+
+    async def prepare(self):
+        await super().prepare()
+        self.author = await aget_object_or_404(
+            User, username=self.kwargs["username"]
+        )
+
+    def get_feed_scope(self):
+        if self.author == self.request.user:
+            return "author"
+        return super().get_feed_scope()
+
+    async def get_context_data(self):
+        context = await super().get_context_data()
+        context["profile"] = self.author
+        return context
+
+
+class AsyncPostDetailView(
+    PostDetailQuerySetMixin, CommentsPageMixin, AsyncReadView
+):
+    """Страница выбранного поста."""
+
+    template_name = "blog/detail.html"
+    query_budget = 4
+
+    async def prepare(self):
+        self.object = await aget_object_or_404(
+            self.get_queryset(), pk=self.kwargs["pk"]
+        )
+        self.remember_content_change(self.object)
+
+    async def get_context_data(self):
+        context = await super().get_context_data()
+        context.update({
+            "object": self.object,
+            "post": self.object,
+            "flag": True,
+            "form": CommentForm(),
+            "comments": await self.aget_comments_page(self.object),
+        })
+        return context
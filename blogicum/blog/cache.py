@@ -0,0 +1,122 @@
+"""Кеш отрендеренных лент постов и карточек постов.
+
+Ключи страниц лент содержат номер поколения. Любое изменение поста,
+комментария, категории или местоположения увеличивает поколение, и все
+ранее сохранённые страницы перестают использоваться без перебора ключей.
+Поколение хранится в кеше и может быть своим у каждого процесса, поэтому
+ключ содержит ещё и номер отметки ContentChange из базы: страница из
+кеша всегда соответствует ETag, который с ней отдаётся.
+
+Карточки постов кешируются отдельно и переживают смену поколения: ключ
+карточки содержит хеш всего, что она выводит, поэтому изменённый пост
+просто получает новый ключ, а карточки остальных постов
+переиспользуются всеми лентами.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from blog.models import ContentChange
+
+FEED_GENERATION_KEY = "blog:feed:generation"
+# Параметры запроса, от которых зависит страница ленты.
+FEED_QUERY_PARAMS = ("page", "cursor")
+# Номер увеличивается при изменении разметки includes/post_card.html или
+# настроек копий изображений, чтобы не отдавать карточки старого вида.
+POST_CARD_KEY_PREFIX = "blog:card:1"
+
+
+def get_feed_cache():
+    return caches[settings.BLOG_FEED_CACHE_ALIAS]
+
+
+def feed_cache_is_shared():
+    """Видят ли поколение кеша лент все процессы сайта.
+
+    У LocMemCache свой кеш в каждом процессе: смена поколения из команды
+    или другого процесса веб-сервера до остальных не доходит, и
+    сохранённые ими ленты живут до истечения BLOG_FEED_CACHE_TIMEOUT.
+    """
+    return not isinstance(get_feed_cache(), LocMemCache)
+
+
+def get_feed_generation():
+    """Возвращает текущее поколение кеша лент."""
+    cache = get_feed_cache()
+    generation = cache.get(FEED_GENERATION_KEY)
+    if generation is None:
+        cache.add(FEED_GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(FEED_GENERATION_KEY, 1)
+    return generation
+
+
+def bump_feed_generation():
+    """Делает недействительными все сохранённые страницы лент."""
+    cache = get_feed_cache()
+    try:
+        cache.incr(FEED_GENERATION_KEY)
+    except ValueError:
+        cache.add(FEED_GENERATION_KEY, 1, timeout=None)
+
+
+def mark_content_changed(using=None):
+    """Отмечает изменение данных, выводимых в лентах и на страницах постов.
+
+    Сдвигает отметку ContentChange в базе, по которой все процессы
+    строят ETag, и поколение кеша лент.
+    """
+    ContentChange.objects.db_manager(using).touch()
+    bump_feed_generation()
+
+
+def feed_cache_key(request, scope, version):
+    """Собирает ключ страницы ленты.
+
+    scope отделяет представления одной и той же ленты для разных
+    зрителей: автор видит в своём профиле неопубликованные посты.
+    version — номер отметки ContentChange, по которой построен ETag.
+    """
+    match = request.resolver_match
+    arguments = ",".join(
+        f"{name}={value}" for name, value in sorted(match.kwargs.items())
+    )
+    # Посторонние параметры запроса не влияют на ленту и не должны
+    # порождать новые записи в кеше.
+    page = ",".join(
+        f"{name}={request.GET.get(name, '')}" for name in FEED_QUERY_PARAMS
+    )
+    return ":".join((
+        str(get_feed_generation()),
+        str(version),
+        match.view_name,
+        arguments,
+        scope,
+        page,
+    ))
+
+
+def post_card_key(post):
+    """Ключ карточки поста, зависящий от всех выводимых в ней данных.
+
+    Пост должен быть загружен вместе с автором, категорией и
+    местоположением, как в Post.objects.post_all_query().
+    """
+    category, location = post.category, post.location
+    version = repr((
+        post.title,
+        post.text,
+        post.pub_date.isoformat(),
+        post.is_published,
+        post.image.name,
+        post.image_size,
+        post.comment_count,
+        post.author.username,
+        category and (category.slug, category.title, category.is_published),
+        location and (location.name, location.is_published),
+    ))
+    digest = hashlib.md5(
+        version.encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"{POST_CARD_KEY_PREFIX}:{post.pk}:{digest}"
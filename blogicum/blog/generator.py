@@ -0,0 +1,206 @@
+"""Генерация синтетических данных блога для нагрузочных тестов.
+
+Faker медленный, поэтому тексты берутся из заранее созданных пулов, а
+объекты собираются генератором случайных чисел с фиксированным зерном:
+при одинаковых параметрах получаются одинаковые данные. Распределения
+неравномерны, как в живом блоге: свежих постов больше, чем старых,
+у небольшой части авторов большинство постов, у популярных постов
+большинство комментариев.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from blog.cache import mark_content_changed
+from blog.images import generate_renditions
+from blog.models import Category, Comment, Location, Post
+
+POOL_SIZE = 500
+IMAGE_POOL_SIZE = 20
+IMAGE_SIZE = (1280, 960)
+
+
+def zipf_weights(count, exponent=1.0):
+    """Накопленные веса, при которых первые элементы выбираются чаще."""
+    return list(accumulate(1 / (rank + 1) ** exponent
+                           for rank in range(count)))
+
+
+class BlogDataGenerator:
+    """Создаёт пользователей, категории, местоположения, посты и
+    комментарии пачками через bulk_create.
+    """
+
+    def __init__(self, seed=0, locale="ru_RU", batch_size=5000,
+                 password="password", using=DEFAULT_DB_ALIAS):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.faker = Faker(locale)
+        self.faker.seed_instance(seed)
+        self.batch_size = batch_size
+        self.password = password
+        self.using = using
+        self.now = timezone.now()
+        self.created = Counter()
+
+    def generate(self, users=100, categories=10, locations=30, posts=1000,
+                 comments=5000, images=0.0, days=5 * 365,
+                 unpublished=0.05, scheduled=0.01):
+        """Создаёт данные и возвращает число объектов по моделям.
+
+        images — доля постов с изображением, days — глубина архива,
+        unpublished и scheduled — доли снятых с публикации и отложенных
+        постов.
+        """
+        self.titles = self.pool(lambda: self.faker.sentence(nb_words=5))
+        self.paragraphs = self.pool(
+            lambda: self.faker.paragraph(nb_sentences=5)
+        )
+        with transaction.atomic(using=self.using):
+            user_ids = self.create_users(users)
+            category_ids = self.create_categories(categories)
+            location_ids = self.create_locations(locations)
+            image_names = self.create_images() if images else []
+            post_ids = self.create_posts(
+                posts, user_ids, category_ids, location_ids, image_names,
+                images, days, unpublished, scheduled,
+            )
+            self.create_comments(comments, post_ids, user_ids)
+            posts = Post.objects.db_manager(self.using)
+            posts.recount_comments()
+            posts.refresh_visibility()
+            mark_content_changed(self.using)
+        return self.created
+
+    def pool(self, factory, size=POOL_SIZE):
+        return [factory() for _ in range(size)]
+
+    def bulk_create(self, model, objects):
+        """Создаёт объекты пачками, не держа в памяти больше одной."""
+        ids = []
+        objects = iter(objects)
+        while batch := list(islice(objects, self.batch_size)):
+            created = model.objects.using(self.using).bulk_create(batch)
+            ids.extend(obj.pk for obj in created)
+        self.created[model._meta.label_lower] += len(ids)
+        return ids
+
+    def create_users(self, count):
+        User = get_user_model()
+        # Один хеш на всех: иначе хеширование займёт больше времени, чем
+        # вся остальная генерация.
+        password = make_password(self.password)
+        names = self.pool(self.faker.user_name)
+        return self.bulk_create(User, (
+            User(
+                username=f"{self.rng.choice(names)}_{self.seed}_{number}",
+                email=f"user{number}@example.com",
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+            )
+            for number in range(count)
+        ))
+
+    def create_categories(self, count):
+        return self.bulk_create(Category, (
+            Category(
+                title=self.faker.word().capitalize(),
+                description=self.rng.choice(self.paragraphs),
+                slug=f"category-{self.seed}-{number}",
+                is_published=self.rng.random() > 0.1,
+            )
+            for number in range(count)
+        ))
+
+    def create_locations(self, count):
+        return self.bulk_create(Location, (
+            Location(
+                name=self.faker.city(),
+                is_published=self.rng.random() > 0.1,
+            )
+            for _ in range(count)
+        ))
+
+    def create_images(self):
+        """Пул изображений, общих для постов, с готовыми копиями."""
+        names = []
+        for number in range(IMAGE_POOL_SIZE):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            buffer = BytesIO()
+            Image.new("RGB", IMAGE_SIZE, color).save(buffer, "JPEG")
+            name = default_storage.save(
+                f"images/synthetic_{self.seed}_{number}.jpg",
+                ContentFile(buffer.getvalue()),
+            )
+            generate_renditions(name)
+            names.append(name)
+        return names
+
+    def pub_date(self, days, scheduled):
+        """Дата публикации: экспоненциально больше свежих постов."""
+        if self.rng.random() < scheduled:
+            return self.now + timedelta(
+                minutes=self.rng.randrange(1, 30 * 24 * 60)
+            )
+        age = min(self.rng.expovariate(5 / days), days)
+        return self.now - timedelta(days=age)
+
+    def create_posts(self, count, user_ids, category_ids, location_ids,
+                     image_names, images, days, unpublished, scheduled):
+        author_weights = zipf_weights(len(user_ids))
+        image_size = "x".join(map(str, IMAGE_SIZE))
+
+        def build(number):
+            image = ""
+            if image_names and self.rng.random() < images:
+                image = self.rng.choice(image_names)
+            return Post(
+                title=self.rng.choice(self.titles).rstrip("."),
+                text="\n\n".join(
+                    self.rng.choices(self.paragraphs, k=self.rng.randint(1, 5))
+                ),
+                pub_date=self.pub_date(days, scheduled),
+                author_id=self.rng.choices(
+                    user_ids, cum_weights=author_weights
+                )[0],
+                category_id=self.rng.choice(category_ids),
+                location_id=(
+                    self.rng.choice(location_ids)
+                    if location_ids and self.rng.random() < 0.7 else None
+                ),
+                is_published=self.rng.random() >= unpublished,
+                image=image,
+                image_size=image_size if image else "",
+            )
+
+        return self.bulk_create(Post, (build(n) for n in range(count)))
+
+    def create_comments(self, count, post_ids, user_ids):
+        if not post_ids:
+            return []
+        # Популярность не связана с порядком создания постов.
+        popular = list(post_ids)
+        self.rng.shuffle(popular)
+        post_weights = zipf_weights(len(popular), exponent=0.8)
+        return self.bulk_create(Comment, (
+            Comment(
+                text=self.rng.choice(self.titles),
+                post_id=post_id,
+                author_id=self.rng.choice(user_ids),
+            )
+            for post_id in self.rng.choices(
+                popular, cum_weights=post_weights, k=count
+            )
+        ))
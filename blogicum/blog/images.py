@@ -0,0 +1,125 @@
+"""Уменьшенные копии изображений постов.
+
+Для каждой ширины из BLOG_IMAGE_WIDTHS рядом с оригиналом сохраняются
+копия в исходном формате и копия в WebP:
+images/photo.jpg -> images/renditions/photo.jpg.640w.jpg,
+photo.jpg.640w.webp. Имя оригинала входит в имя копии целиком, чтобы
+photo.jpg и photo.png не делили копии.
+
+Копии создаются при загрузке изображения и командой
+generate_image_renditions. Страницы их не создают: пока размеры
+оригинала не сохранены, выводится сам оригинал.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITIONS_DIR = 'renditions'
+WEBP = 'webp'
+FORMATS = {'jpeg': 'jpg', 'png': 'png', 'gif': 'png', WEBP: WEBP}
+# Ошибки чтения отсутствующего, повреждённого или слишком большого файла.
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def rendition_name(name, width, extension):
+    """Имя файла копии изображения заданной ширины."""
+    directory, filename = posixpath.split(name)
+    return posixpath.join(
+        directory, RENDITIONS_DIR, f'{filename}.{width}w.{extension}'
+    )
+
+
+def rendition_widths(original_width):
+    """Ширины копий, не превышающие ширину оригинала."""
+    widths = [w for w in settings.BLOG_IMAGE_WIDTHS if w < original_width]
+    return widths + [original_width] if original_width else widths
+
+
+def source_extension(name):
+    """Расширение копий в исходном формате."""
+    extension = posixpath.splitext(name)[1].lstrip('.').lower()
+    return FORMATS.get('jpeg' if extension == 'jpg' else extension, 'jpg')
+
+
+def generate_renditions(name, storage=default_storage):
+    """Создаёт недостающие копии изображения.
+
+    Возвращает размеры оригинала (ширина, высота).
+    """
+    with storage.open(name) as file:
+        with Image.open(file) as original:
+            original = ImageOps.exif_transpose(original)
+            size = original.size
+            extension = source_extension(name)
+            for width in rendition_widths(size[0]):
+                height = round(size[1] * width / size[0])
+                resized = None
+                for target in (extension, WEBP):
+                    target_name = rendition_name(name, width, target)
+                    if storage.exists(target_name):
+                        continue
+                    if resized is None:
+                        resized = original.resize(
+                            (width, height), Image.Resampling.LANCZOS
+                        )
+                    storage.save(target_name, _encode(resized, target))
+    return size
+
+
+def delete_renditions(name, size, storage=default_storage):
+    """Удаляет копии изображения, созданные для размеров оригинала size."""
+    widths = set(settings.BLOG_IMAGE_WIDTHS)
+    if size:
+        widths.update(rendition_widths(size[0]))
+    for width in widths:
+        for extension in (source_extension(name), WEBP):
+            storage.delete(rendition_name(name, width, extension))
+
+
+def _encode(image, extension):
+    if extension == 'jpg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format='JPEG' if extension == 'jpg' else extension.upper(),
+        quality=settings.BLOG_IMAGE_QUALITY,
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def responsive_image(image, size, rendition):
+    """Данные для тега <img> с srcset и WebP-источником.
+
+    size — сохранённые размеры оригинала; они сохраняются только после
+    создания копий. Без них выводится оригинал без srcset.
+    """
+    if not size:
+        return {'src': image.url}
+    extension = source_extension(image.name)
+    width, height = size
+    widths = rendition_widths(width)
+    target = settings.BLOG_IMAGE_RENDITIONS[rendition]
+    src_width = next((w for w in widths if w >= target), widths[-1])
+
+    def srcset(extension):
+        return ', '.join(
+            f'{default_storage.url(rendition_name(image.name, w, extension))}'
+            f' {w}w'
+            for w in widths
+        )
+
+    return {
+        'src': default_storage.url(
+            rendition_name(image.name, src_width, extension)
+        ),
+        'srcset': srcset(extension),
+        'webp_srcset': srcset(WEBP),
+        'sizes': settings.BLOG_IMAGE_SIZES[rendition],
+        'width': src_width,
+        'height': round(height * src_width / width),
+    }
@@ -0,0 +1,215 @@
+"""Потоковый импорт данных блога из выгрузки dumpdata.
+
+В отличие от loaddata, объекты не сохраняются по одному через save():
+выгрузка читается по частям, объекты копятся в пачки по моделям и
+вставляются многострочными INSERT. Проверка внешних ключей откладывается
+до конца импорта, поэтому порядок моделей в выгрузке не важен; только
+пользователь, на которого ссылаются натуральным ключом, должен идти в
+выгрузке раньше ссылки или уже быть в базе.
+"""
+import json
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from blog.cache import mark_content_changed
+from blog.models import Post
+
+IMPORT_MODELS = (
+    "auth.user",
+    "blog.category",
+    "blog.location",
+    "blog.post",
+    "blog.comment",
+)
+USER_FOREIGN_KEYS = {
+    "blog.post": ("author",),
+    "blog.comment": ("author",),
+}
+SEPARATORS = " \t\r\n,"
+# Предел длины одного объекта выгрузки в символах.
+MAX_ITEM_SIZE = 16 << 20
+
+
+def iter_json_array(stream, chunk_size=1 << 20, max_item_size=MAX_ITEM_SIZE):
+    """Возвращает элементы JSON-массива по одному, читая файл частями.
+
+    В памяти держится не больше одной части файла и одного элемента.
+    Элемент длиннее max_item_size символов считается повреждённым:
+    иначе ошибка в одном элементе заставила бы дочитать в память весь
+    остаток выгрузки.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size).lstrip(SEPARATORS)
+    if not buffer.startswith("["):
+        raise ValueError("Выгрузка должна быть JSON-массивом.")
+    position = 1
+    consumed = 0
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            if position == len(buffer):
+                raise json.JSONDecodeError("", buffer, position)
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            if len(buffer) - position > max_item_size:
+                raise ValueError(
+                    f"Элемент выгрузки с символа {consumed + position} "
+                    f"длиннее {max_item_size} символов или повреждён: "
+                    f"{error.msg}."
+                )
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise ValueError("Выгрузка оборвалась до конца массива.")
+            consumed += position
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+
+
+class BlogImporter:
+    """Импортирует пользователей, категории, местоположения, посты и
+    комментарии пачками по batch_size объектов каждой модели.
+    """
+
+    def __init__(self, batch_size=5000, using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size
+        self.using = using
+        self.buffers = defaultdict(list)
+        self.imported = Counter()
+        self.models = {}
+        self.skipped = Counter()
+        self.usernames = {}
+        self.now = timezone.now()
+
+    def run(self, items):
+        """Импортирует объекты одной транзакцией."""
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            with connection.constraint_checks_disabled():
+                objects = serializers.deserialize(
+                    "python",
+                    self.prepare(items),
+                    using=self.using,
+                    ignorenonexistent=True,
+                )
+                for deserialized in objects:
+                    self.add(deserialized)
+                for model in list(self.buffers):
+                    self.flush(model)
+            models = list(self.models.values())
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in models]
+            )
+            self.reset_sequences(connection, models)
+            posts = Post.objects.db_manager(self.using)
+            if self.imported["blog.comment"] or self.imported["blog.post"]:
+                posts.recount_comments()
+            # Флаг из выгрузки мог устареть, а категории могли смениться.
+            if self.imported["blog.post"] or self.imported["blog.category"]:
+                posts.refresh_visibility()
+            mark_content_changed(self.using)
+        return self.imported
+
+    def prepare(self, items):
+        """Отбрасывает лишние модели и подставляет pk вместо натуральных
+        ключей пользователей.
+        """
+        for item in items:
+            label = item.get("model", "").lower()
+            if label not in IMPORT_MODELS:
+                self.skipped[label] += 1
+                continue
+            if "pk" not in item:
+                raise ValueError(
+                    f"Объект {label} без pk: выгрузите данные без "
+                    "--natural-primary."
+                )
+            fields = item["fields"]
+            if label == "auth.user":
+                self.usernames[fields["username"]] = item["pk"]
+            for name in USER_FOREIGN_KEYS.get(label, ()):
+                if isinstance(fields.get(name), list):
+                    fields[name] = self.resolve_username(fields[name][0])
+            yield item
+
+    def resolve_username(self, username):
+        """Натуральный ключ пользователя: сначала среди уже прочитанных
+        объектов выгрузки, затем в базе.
+        """
+        if username not in self.usernames:
+            pks = get_user_model().objects.using(self.using).filter(
+                username=username
+            ).values_list("pk", flat=True)
+            if not pks:
+                raise ValueError(
+                    f"Пользователь {username} не найден ни в базе, ни выше "
+                    "в выгрузке."
+                )
+            self.usernames[username] = pks[0]
+        return self.usernames[username]
+
+    def add(self, deserialized):
+        instance = deserialized.object
+        model = type(instance)
+        for field in model._meta.concrete_fields:
+            # Импорт считается изменением: по Post.updated_at импортированные
+            # посты подхватит догоняющая переиндексация поиска.
+            if getattr(field, "auto_now", False) or (
+                getattr(field, "auto_now_add", False)
+                and getattr(instance, field.attname) is None
+            ):
+                setattr(instance, field.attname, self.now)
+        self.append(model, instance)
+        for name, values in (deserialized.m2m_data or {}).items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+            for value in values:
+                self.append(
+                    through, through(**{source: instance.pk, target: value})
+                )
+
+    def append(self, model, instance):
+        buffer = self.buffers[model]
+        buffer.append(instance)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        """Вставляет накопленные объекты модели.
+
+        bulk_create перезаписал бы поля auto_now и auto_now_add текущим
+        временем, поэтому вставка идёт в режиме raw, как у loaddata.
+        """
+        objects = self.buffers.pop(model, [])
+        if not objects:
+            return
+        fields = model._meta.local_concrete_fields
+        connection = connections[self.using]
+        step = connection.ops.bulk_batch_size(fields, objects) or len(objects)
+        for start in range(0, len(objects), step):
+            model._base_manager._insert(
+                objects[start:start + step],
+                fields=fields,
+                raw=True,
+                using=self.using,
+            )
+        self.models[model._meta.label_lower] = model
+        self.imported[model._meta.label_lower] += len(objects)
+
+    def reset_sequences(self, connection, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
@@ -0,0 +1,147 @@
+"""Отправка писем из очереди OutgoingEmail."""
+import smtplib
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Comment, CommentDigest, OutgoingEmail
+
+# Отказы сервера принять конкретное письмо: соединение после них живо.
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.BLOG_MAIL_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def is_connection_error(error):
+    """Ошибка соединения с почтовым сервером, а не отдельного письма."""
+    return isinstance(error, OSError) and not isinstance(
+        error, MESSAGE_ERRORS
+    )
+
+
+def reopen_connection(connection):
+    """Заменяет оборвавшееся соединение новым.
+
+    Возвращает False, если сервер недоступен.
+    """
+    connection.close()
+    try:
+        connection.open()
+    except OSError:
+        return False
+    return True
+
+
+def send_queued_batch(connection, batch_size):
+    """Отправляет одну пачку писем через открытое соединение.
+
+    После обрыва соединение открывается заново. Если сервер недоступен,
+    оставшиеся письма пачки не отправляются и не тратят попытку: их
+    снова заберут после BLOG_MAIL_CLAIM_TIMEOUT.
+
+    Возвращает пару (отправлено, не отправлено).
+    """
+    emails = OutgoingEmail.objects.claim(batch_size)
+    processed = []
+    sent = failed = 0
+    for email in emails:
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.message,
+            from_email=email.from_email,
+            to=[email.recipient],
+            connection=connection,
+        )
+        now = timezone.now()
+        processed.append(email)
+        try:
+            message.send()
+        except Exception as error:
+            email.attempts += 1
+            email.last_error = f'{type(error).__name__}: {error}'
+            email.next_attempt_at = now + retry_delay(email.attempts)
+            failed += 1
+            if is_connection_error(error) and not reopen_connection(
+                connection
+            ):
+                break
+        else:
+            email.attempts += 1
+            email.sent_at = now
+            sent += 1
+    OutgoingEmail.objects.bulk_update(
+        processed, ('attempts', 'last_error', 'next_attempt_at', 'sent_at')
+    )
+    return sent, failed
+
+
+def format_digest(comments):
+    """Текст сводки новых комментариев к постам автора."""
+    lines = [f"Новых комментариев к вашим постам: {len(comments)}.", ""]
+    for comment in comments:
+        post_url = settings.BLOG_SITE_URL + comment.post.get_absolute_url()
+        lines.append(
+            f"{comment.author.username} прокомментировал пост"
+            f" «{comment.post.title}»: {post_url}"
+        )
+    return "\n".join(lines)
+
+
+@transaction.atomic
+def enqueue_comment_digests(now=None):
+    """Ставит в очередь сводки для авторов, у которых истекло окно.
+
+    Число запросов не зависит от количества авторов и комментариев.
+    Возвращает количество поставленных в очередь писем.
+    """
+    now = now or timezone.now()
+    window_start = now - timedelta(seconds=settings.BLOG_DIGEST_WINDOW)
+    digests = list(
+        CommentDigest.objects.select_related("author").filter(
+            last_sent_at__lte=window_start
+        )
+    )
+    if not digests:
+        return 0
+    new_comments = defaultdict(list)
+    comments = Comment.objects.select_related("post", "author").filter(
+        post__author__in=[digest.author for digest in digests],
+        created_at__gt=min(digest.last_sent_at for digest in digests),
+        created_at__lte=now,
+    ).exclude(
+        author=F("post__author")
+    ).order_by("created_at")
+    for comment in comments:
+        new_comments[comment.post.author_id].append(comment)
+
+    emails = []
+    for digest in digests:
+        author_comments = [
+            comment for comment in new_comments[digest.author.pk]
+            if comment.created_at > digest.last_sent_at
+        ]
+        digest.last_sent_at = now
+        if author_comments and digest.author.email:
+            emails.append(OutgoingEmail(
+                subject="New comments",
+                message=format_digest(author_comments),
+                from_email=settings.EMAIL_FROM,
+                recipient=digest.author.email,
+            ))
+    OutgoingEmail.objects.bulk_create(emails)
+    CommentDigest.objects.bulk_update(digests, ("last_sent_at",))
+    return len(emails)
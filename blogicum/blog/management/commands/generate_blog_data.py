@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.generator import BlogDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, категории, местоположения, '
+        'посты и комментарии для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 100, 'Количество пользователей.'),
+            ('categories', 10, 'Количество категорий.'),
+            ('locations', 30, 'Количество местоположений.'),
+            ('posts', 1000, 'Количество постов.'),
+            ('comments', 5000, 'Количество комментариев.'),
+            ('days', 5 * 365, 'Глубина архива постов в днях.'),
+            ('seed', 0, 'Зерно генератора: одно зерно — одни данные.'),
+            ('batch-size', 5000, 'Сколько объектов создавать за раз.'),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default, help=help_text
+            )
+        parser.add_argument(
+            '--images',
+            type=float,
+            default=0.0,
+            help='Доля постов с изображением, от 0 до 1.',
+        )
+        parser.add_argument(
+            '--password',
+            default='password',
+            help='Пароль всех созданных пользователей.',
+        )
+
+    def handle(self, *args, **options):
+        generator = BlogDataGenerator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            password=options['password'],
+        )
+        started = time.monotonic()
+        created = generator.generate(
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments=options['comments'],
+            images=options['images'],
+            days=options['days'],
+        )
+        elapsed = time.monotonic() - started
+        for label, count in sorted(created.items()):
+            self.stdout.write(f'{label}: {count}')
+        total = sum(created.values())
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано объектов: {total} за {elapsed:.1f} с '
+            f'({rate:.0f} строк/с)'
+        ))
+        if created['blog.post']:
+            self.stdout.write(
+                'Чтобы посты появились в поиске, запустите '
+                'rebuild_search_index.'
+            )
@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog.images import IMAGE_ERRORS, generate_renditions
+from blog.models import Post
+
+
+def process_image(item):
+    pk, name = item
+    try:
+        return pk, generate_renditions(name), None
+    except IMAGE_ERRORS as error:
+        return pk, None, f'{type(error).__name__}: {error}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии уже загруженных изображений постов '
+        'и сохраняет их размеры.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Количество процессов, по умолчанию — число ядер.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов обновлять в базе за раз.',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Обрабатывать только посты без сохранённых размеров.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').order_by('pk')
+        if options['missing_only']:
+            posts = posts.filter(image_size='')
+        items = list(posts.values_list('pk', 'image'))
+        started = time.monotonic()
+        done = failed = 0
+        batch = []
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=django.setup
+        ) as pool:
+            results = pool.map(process_image, items, chunksize=16)
+            for pk, size, error in results:
+                if error:
+                    failed += 1
+                    self.stderr.write(f'Пост {pk}: {error}')
+                    continue
+                post = Post(pk=pk)
+                post.image_dimensions = size
+                batch.append(post)
+                if len(batch) >= options['batch_size']:
+                    done += self.save_sizes(batch)
+                    batch = []
+        done += self.save_sizes(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {done}, ошибок: {failed}, '
+            f'за {elapsed:.1f} с'
+        ))
+
+    def save_sizes(self, posts):
+        Post.objects.bulk_update(posts, ('image_size',))
+        return len(posts)
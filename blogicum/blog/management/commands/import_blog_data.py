@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, IntegrityError
+
+from blog.importer import MAX_ITEM_SIZE, BlogImporter, iter_json_array
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует пользователей, категории, местоположения, посты и '
+        'комментарии из выгрузки dumpdata без поштучного сохранения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к JSON-выгрузке.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько объектов одной модели вставлять за раз.',
+        )
+        parser.add_argument(
+            '--read-size',
+            type=int,
+            default=1 << 20,
+            help='Сколько символов выгрузки читать за раз.',
+        )
+        parser.add_argument(
+            '--max-item-size',
+            type=int,
+            default=MAX_ITEM_SIZE,
+            help='Максимальная длина одного объекта выгрузки в символах.',
+        )
+
+    def handle(self, *args, **options):
+        importer = BlogImporter(batch_size=options['batch_size'])
+        started = time.monotonic()
+        try:
+            with open(options['path'], encoding='utf-8') as stream:
+                imported = importer.run(iter_json_array(
+                    stream, options['read_size'], options['max_item_size']
+                ))
+        except (OSError, ValueError, IntegrityError, DatabaseError) as error:
+            raise CommandError(f'Импорт отменён: {error}')
+        elapsed = time.monotonic() - started
+        for label, count in sorted(imported.items()):
+            self.stdout.write(f'{label}: {count}')
+        for label, count in sorted(importer.skipped.items()):
+            self.stdout.write(f'{label}: пропущено {count}')
+        total = sum(imported.values())
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано объектов: {total} за {elapsed:.1f} с '
+            f'({rate:.0f} строк/с)'
+        ))
+        if imported['blog.post']:
+            self.stdout.write(
+                'Чтобы посты появились в поиске, запустите '
+                'rebuild_search_index.'
+            )
@@ -0,0 +1,178 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post, SearchIndexCheckpoint
+from blog.search import clear_index, get_backend, tokenize_rows, write_entries
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class InlineExecutor:
+    """Исполнитель без процессов для --workers 0."""
+
+    def submit(self, function, *args):
+        return _Done(function(*args))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _Done:
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит поисковый индекс постов. Без --full продолжает прерванное '
+        'построение или доиндексирует посты, у которых updated_at новее '
+        'прошлого запуска; QuerySet.update() его не меняет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Очистить индекс и построить его заново.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help=(
+                'Количество процессов разбора текста, по умолчанию — число '
+                'ядер; 0 — разбирать в текущем процессе.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за один запрос.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов записывать в индекс одной транзакцией.',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        backend = get_backend()
+        checkpoint = SearchIndexCheckpoint.objects.filter(
+            backend=backend
+        ).first()
+        if options['full'] or checkpoint is None:
+            checkpoint = self.reset(backend)
+
+        started = time.monotonic()
+        if checkpoint.indexed_until is None:
+            self.stdout.write(
+                f'Полное построение индекса {backend} '
+                f'с поста #{checkpoint.last_pk + 1}.'
+            )
+            done = self.build(checkpoint)
+            checkpoint.indexed_until = checkpoint.started_at
+            checkpoint.save(update_fields=('indexed_until',))
+        else:
+            done = self.catch_up(checkpoint)
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {done} за {elapsed:.1f} с '
+            f'({rate:.0f} постов/с)'
+        ))
+
+    def reset(self, backend):
+        with transaction.atomic():
+            clear_index()
+            checkpoint, _ = SearchIndexCheckpoint.objects.update_or_create(
+                backend=backend,
+                defaults={
+                    'started_at': timezone.now(),
+                    'last_pk': 0,
+                    'indexed_until': None,
+                },
+            )
+        return checkpoint
+
+    def build(self, checkpoint):
+        """Индексирует посты по возрастанию pk, сохраняя позицию."""
+        posts = Post.objects.filter(pk__gt=checkpoint.last_pk)
+
+        def save_progress(batch):
+            checkpoint.last_pk = batch[-1][0]
+            checkpoint.save(update_fields=('last_pk',))
+
+        return self.index(posts, on_batch=save_progress)
+
+    def catch_up(self, checkpoint):
+        """Переиндексирует посты, изменённые после отметки индекса.
+
+        Изменение видно по Post.updated_at, а его обновляют только save()
+        и импорт выгрузки. QuerySet.update() поле auto_now не трогает:
+        массовая правка заголовков или текстов должна явно задавать
+        updated_at, иначе нужен запуск с --full. Массовые обновления
+        счётчиков, размеров изображений и видимости индекс не меняют.
+        """
+        mark = timezone.now()
+        self.stdout.write(
+            f'Доиндексация постов, изменённых с {checkpoint.indexed_until}.'
+        )
+        posts = Post.objects.filter(updated_at__gte=checkpoint.indexed_until)
+        done = self.index(posts)
+        checkpoint.indexed_until = mark
+        checkpoint.save(update_fields=('indexed_until',))
+        return done
+
+    def index(self, posts, on_batch=None):
+        rows = posts.order_by('pk').values_list(
+            'pk', 'title', 'text'
+        ).iterator(chunk_size=self.options['chunk_size'])
+        workers = self.options['workers']
+        if workers == 0:
+            executor = InlineExecutor()
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=django.setup
+            )
+        window = 2 * (workers or os.cpu_count() or 1)
+        done = 0
+        with executor:
+            # Ограничиваем число партий в работе, чтобы не читать всю
+            # таблицу в память раньше, чем процессы успеют её разобрать.
+            pending = deque()
+            for batch in batched(rows, self.options['batch_size']):
+                pending.append(executor.submit(tokenize_rows, batch))
+                if len(pending) > window:
+                    done += self.write(pending.popleft(), on_batch)
+            while pending:
+                done += self.write(pending.popleft(), on_batch)
+        return done
+
+    def write(self, future, on_batch):
+        entries = future.result()
+        with transaction.atomic():
+            write_entries(entries)
+            if on_batch is not None:
+                on_batch(entries)
+        return len(entries)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import mark_content_changed
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает отложенные посты, время публикации которых наступило, '
+        'пересчитывая флаг is_visible.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать флаг у всех постов, а не только у отложенных.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять пересчёт каждые N секунд до остановки.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.refresh(options['all'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def refresh(self, everything):
+        if everything:
+            changed = Post.objects.refresh_visibility()
+        else:
+            changed = Post.objects.refresh_visibility(
+                is_visible=False,
+                is_published=True,
+                pub_date__lte=timezone.now(),
+            )
+        if changed:
+            # Массовое обновление не отправляет сигналы сохранения.
+            mark_content_changed()
+        self.stdout.write(f'Изменена видимость постов: {changed}')
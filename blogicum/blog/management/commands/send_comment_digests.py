@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.mail import enqueue_comment_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Ставит в очередь сводки новых комментариев для авторов, '
+        'подписанных на сводку. Отправляет их send_queued_mail.'
+    )
+
+    def handle(self, *args, **options):
+        queued = enqueue_comment_digests()
+        self.stdout.write(
+            self.style.SUCCESS(f'Поставлено в очередь сводок: {queued}')
+        )
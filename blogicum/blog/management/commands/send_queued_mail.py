@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from blog.mail import send_queued_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.BLOG_MAIL_BATCH_SIZE,
+            help='Количество писем, забираемых из очереди за раз.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах между опросами пустой очереди.',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        connection = get_connection()
+        connection.open()
+        try:
+            while True:
+                sent, failed = send_queued_batch(
+                    connection, options['batch_size']
+                )
+                total_sent += sent
+                total_failed += failed
+                if sent + failed:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено: {total_sent}, ошибок: {total_failed}'
+        ))
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.cache import bump_feed_generation, feed_cache_is_shared
+
+
+def replica_path(alias):
+    """Путь к файлу реплики из имени вида file:/path/db.sqlite3?mode=ro."""
+    name = str(settings.DATABASES[alias]['NAME'])
+    return name.removeprefix('file:').partition('?')[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из BLOG_DB_REPLICAS '
+        'через backup API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять копирование каждые N секунд до остановки.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.BLOG_DB_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте переменную окружения '
+                'BLOG_DB_REPLICAS.'
+            )
+        while True:
+            self.sync()
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self):
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        for alias in settings.BLOG_DB_REPLICAS:
+            started = time.monotonic()
+            path = replica_path(alias)
+            self.copy(primary.connection, path)
+            self.stdout.write(
+                f'{alias}: {path} за {time.monotonic() - started:.2f} с'
+            )
+        if feed_cache_is_shared():
+            # Ленты, закешированные по устаревшей реплике, больше не нужны.
+            bump_feed_generation()
+
+    def copy(self, source, path):
+        """Снимает согласованную копию во временный файл и подменяет им
+        реплику: открытые соединения дочитывают старый файл, новые
+        открывают новый.
+        """
+        temporary = f'{path}.sync'
+        target = sqlite3.connect(temporary)
+        try:
+            source.backup(target)
+            # Реплика открывается только на чтение, а в режиме WAL для
+            # этого нужны служебные файлы рядом с базой.
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+        os.replace(temporary, path)
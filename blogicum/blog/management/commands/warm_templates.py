@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templates import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и сообщает об ошибках и '
+        'времени компиляции.'
+    )
+
+    def handle(self, *args, **options):
+        compiled, errors = warm_templates()
+        for name, seconds in compiled:
+            self.stdout.write(f'{name}: {seconds * 1000:.2f} мс')
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        total = sum(seconds for _, seconds in compiled)
+        self.stdout.write(
+            f'Шаблонов: {len(compiled)}, всего {total * 1000:.1f} мс'
+        )
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
@@ -1,4 +1,8 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -10,18 +14,144 @@ class PostManager(models.Manager):
             "category",
             "location",
             "author"
-        ).annotate(
-            comment_count=models.Count("comments")
         ).order_by("-pub_date")
 
-    def post_published_query(self):
-        """Возвращает опубликованные посты."""
-        return self.post_all_query().filter(
+    @staticmethod
+    def published_filter():
+        """Условие, при котором пост виден всем пользователям.
+
+        Флаг is_visible хранит visibility_condition(), поэтому ленты
+        читают одну таблицу по частичному индексу без соединения с
+        категориями.
+        """
+        return models.Q(is_visible=True)
+
+    def visibility_condition(self):
+        """Пост опубликован, его время наступило, а категория
+        опубликована.
+        """
+        categories = self.model.category.field.related_model.objects
+        return models.Q(
+            models.Exists(categories.filter(
+                pk=models.OuterRef("category_id"), is_published=True
+            )),
             pub_date__lte=timezone.now(),
             is_published=True,
-            category__is_published=True,
         )
 
+    def refresh_visibility(self, **filters):
+        """Пересчитывает is_visible у постов, отобранных по filters.
+
+        Возвращает количество постов, у которых флаг изменился.
+        """
+        visible = models.ExpressionWrapper(
+            self.visibility_condition(), output_field=models.BooleanField()
+        )
+        stale = self.filter(**filters).annotate(visible=visible).exclude(
+            is_visible=models.F("visible")
+        ).values("pk")
+        return self.filter(pk__in=stale).update(is_visible=visible)
+
+    def post_published_query(self):
+        """Возвращает опубликованные посты."""
+        return self.post_all_query().filter(self.published_filter())
+
+    def post_visible_to(self, user):
+        """Возвращает посты, которые может видеть пользователь.
+
+        Автор видит свои посты независимо от публикации.
+        """
+        visible = self.published_filter()
+        if user.is_authenticated:
+            visible |= models.Q(author=user)
+        return self.post_all_query().filter(visible)
+
     def get_post_data(self, pk):
         """Возвращает данные поста."""
         return get_object_or_404(self.post_all_query(), pk=pk)
+
+    def change_comment_count(self, pk, delta):
+        """Сдвигает счётчик комментариев поста на delta."""
+        return self.filter(pk=pk).update(
+            comment_count=Greatest(models.F("comment_count") + delta, 0)
+        )
+
+    def recount_comments(self):
+        """Пересчитывает разошедшиеся счётчики комментариев.
+
+        Возвращает количество исправленных постов.
+        """
+        counts = self.model.comments.field.model.objects.filter(
+            post=models.OuterRef("pk")
+        ).order_by().values("post").annotate(
+            total=models.Count("pk")
+        ).values("total")
+        actual = Coalesce(models.Subquery(counts), 0)
+        stale = self.annotate(actual=actual).exclude(
+            comment_count=models.F("actual")
+        ).values("pk")
+        return self.filter(pk__in=stale).update(comment_count=actual)
+
+
+class ContentChangeManager(models.Manager):
+    PK = 1
+
+    def touch(self):
+        """Отмечает изменение данных страниц.
+
+        Вызывается в транзакции самого изменения, чтобы отметка и данные
+        становились видны вместе.
+        """
+        changes = self.filter(pk=self.PK)
+        values = {
+            "version": models.F("version") + 1,
+            "changed_at": timezone.now(),
+        }
+        if not changes.update(**values):
+            self.get_or_create(pk=self.PK)
+            changes.update(**values)
+
+    def current(self):
+        """Версия и время последнего изменения, (0, None) до первого."""
+        return self.filter(pk=self.PK).values_list(
+            "version", "changed_at"
+        ).first() or (0, None)
+
+    async def acurrent(self):
+        """Асинхронный вариант current()."""
+        return await self.filter(pk=self.PK).values_list(
+            "version", "changed_at"
+        ).afirst() or (0, None)
+
+
+class OutgoingEmailManager(models.Manager):
+    def enqueue(self, subject, message, recipient, from_email=None):
+        """Ставит письмо в очередь на отправку."""
+        return self.create(
+            subject=subject,
+            message=message,
+            recipient=recipient,
+            from_email=from_email or settings.EMAIL_FROM,
+        )
+
+    def ready(self):
+        """Возвращает письма, которые пора отправить."""
+        return self.filter(
+            sent_at__isnull=True,
+            next_attempt_at__lte=timezone.now(),
+            attempts__lt=settings.BLOG_MAIL_MAX_ATTEMPTS,
+        ).order_by("next_attempt_at")
+
+    def claim(self, limit):
+        """Забирает пачку писем на отправку.
+
+        Время следующей попытки сдвигается вперёд, чтобы другие
+        обработчики очереди не взяли те же письма.
+        """
+        now = timezone.now()
+        lease = now + timedelta(seconds=settings.BLOG_MAIL_CLAIM_TIMEOUT)
+        pks = list(self.ready().values_list("pk", flat=True)[:limit])
+        self.filter(pk__in=pks, next_attempt_at__lte=now).update(
+            next_attempt_at=lease
+        )
+        return list(self.filter(pk__in=pks, next_attempt_at=lease))
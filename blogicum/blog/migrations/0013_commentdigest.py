@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0012_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentDigest',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='comment_digest', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('last_sent_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Последняя сводка')),
+            ],
+            options={
+                'verbose_name': 'сводка комментариев',
+                'verbose_name_plural': 'Сводки комментариев',
+            },
+        ),
+    ]
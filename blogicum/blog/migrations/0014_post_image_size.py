@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_commentdigest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_size',
+            field=models.CharField(blank=True, editable=False, help_text='Ширина и высота в пикселях, например 640x480.', max_length=32, verbose_name='Размеры изображения'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        options = {row[0] for row in cursor.fetchall()}
+    if 'ENABLE_FTS5' not in options:
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # Совпадение в заголовке важнее совпадения в тексте.
+    schema_editor.execute(
+        "INSERT INTO blog_post_fts (blog_post_fts, rank) "
+        "VALUES ('rank', 'bm25(10.0, 1.0)')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_image_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+                'constraints': [models.UniqueConstraint(fields=('term', 'post'), name='post_search_term_unique')],
+            },
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:59
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexCheckpoint',
+            fields=[
+                ('backend', models.CharField(max_length=16, primary_key=True, serialize=False, verbose_name='Хранилище индекса')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Начало полного построения')),
+                ('last_pk', models.PositiveBigIntegerField(default=0, verbose_name='Последний проиндексированный пост')),
+                ('indexed_until', models.DateTimeField(blank=True, help_text='Пусто, пока полное построение не завершено.', null=True, verbose_name='Индекс актуален на')),
+            ],
+            options={
+                'verbose_name': 'состояние поискового индекса',
+                'verbose_name_plural': 'Состояния поискового индекса',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated_at'], name='post_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_content_change(apps, schema_editor):
+    ContentChange = apps.get_model('blog', 'ContentChange')
+    ContentChange.objects.create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Номер изменения')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'отметка изменения данных',
+                'verbose_name_plural': 'Отметки изменения данных',
+            },
+        ),
+        migrations.RunPython(
+            create_content_change, migrations.RunPython.noop
+        ),
+    ]
@@ -1,9 +1,12 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from constants import LIMIT
-from blog.managers import PostManager
+from blog.managers import (
+    ContentChangeManager, OutgoingEmailManager, PostManager
+)
 
 User = get_user_model()
 
@@ -97,6 +100,32 @@ class Post(PubCreateModel):
         verbose_name='Изображение',
         blank=True,
     )
+    image_size = models.CharField(
+        max_length=32,
+        blank=True,
+        editable=False,
+        verbose_name='Размеры изображения',
+        help_text='Ширина и высота в пикселях, например 640x480.',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден всем',
+        help_text=(
+            'Опубликован, время публикации наступило и категория '
+            'опубликована. Отложенные посты открывает команда '
+            'refresh_post_visibility.'
+        ),
+    )
 
     objects = PostManager()
 
@@ -105,6 +134,30 @@ class Post(PubCreateModel):
         verbose_name_plural = 'Публикации'
         default_related_name = "posts"
         ordering = ("-pub_date",)
+        indexes = (
+            # Главная лента: только видимые всем посты.
+            models.Index(
+                fields=("-pub_date",),
+                condition=models.Q(is_visible=True),
+                name="post_visible_feed_idx",
+            ),
+            # Лента категории.
+            models.Index(
+                fields=("category", "-pub_date"),
+                condition=models.Q(is_visible=True),
+                name="post_visible_category_idx",
+            ),
+            # Лента профиля, включая неопубликованные посты автора.
+            models.Index(
+                fields=("author", "-pub_date"),
+                name="post_author_feed_idx",
+            ),
+            # Догоняющая переиндексация изменённых постов.
+            models.Index(
+                fields=("updated_at",),
+                name="post_updated_idx",
+            ),
+        )
 
     def __str__(self):
 
@@ -113,6 +166,40 @@ class Post(PubCreateModel):
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.pk})
 
+    def save(self, *args, update_fields=None, **kwargs):
+        """Сохраняет пост, не перезаписывая счётчик комментариев.
+
+        Счётчик меняют только сигналы комментариев через F(): значение,
+        загруженное формой или админкой до нового комментария, при
+        полном сохранении затёрло бы его.
+        """
+        if (
+            update_fields is None
+            and self.pk is not None
+            and not self._state.adding
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'comment_count'
+                and field.attname not in deferred
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    @property
+    def image_dimensions(self):
+        """Ширина и высота изображения, если они известны."""
+        if not self.image_size:
+            return None
+        width, height = self.image_size.split('x')
+        return int(width), int(height)
+
+    @image_dimensions.setter
+    def image_dimensions(self, size):
+        self.image_size = '{}x{}'.format(*size) if size else ''
+
 
 class Comment(PubCreateModel):
     """Комментарий."""
@@ -138,6 +225,163 @@ class Comment(PubCreateModel):
         verbose_name_plural = 'Комментарии'
         default_related_name = "comments"
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return f'{self.author.username}: {self.text[:LIMIT]}'
+
+
+class ContentChange(models.Model):
+    """Отметка последнего изменения данных, выводимых на страницах постов
+    и лент.
+
+    Единственная запись; её сдвигают сигналы и массовые операции, а
+    условный GET сравнивает с ней ETag и If-Modified-Since.
+    """
+
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер изменения'
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Время изменения'
+    )
+
+    objects = ContentChangeManager()
+
+    class Meta:
+        verbose_name = 'отметка изменения данных'
+        verbose_name_plural = 'Отметки изменения данных'
+
+    def __str__(self):
+        return str(self.version)
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField(max_length=256, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст письма')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipient = models.EmailField(verbose_name='Получатель')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('next_attempt_at',),
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+
+class CommentDigest(models.Model):
+    """Подписка автора на сводку новых комментариев вместо писем."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='comment_digest',
+        verbose_name='Автор',
+    )
+    last_sent_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Последняя сводка'
+    )
+
+    class Meta:
+        verbose_name = 'сводка комментариев'
+        verbose_name_plural = 'Сводки комментариев'
+
+    def __str__(self):
+        return self.author.username
+
+
+class SearchIndexCheckpoint(models.Model):
+    """Состояние построения поискового индекса."""
+
+    backend = models.CharField(
+        max_length=16,
+        primary_key=True,
+        verbose_name='Хранилище индекса',
+    )
+    started_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Начало полного построения'
+    )
+    last_pk = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Последний проиндексированный пост'
+    )
+    indexed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Индекс актуален на',
+        help_text='Пусто, пока полное построение не завершено.',
+    )
+
+    class Meta:
+        verbose_name = 'состояние поискового индекса'
+        verbose_name_plural = 'Состояния поискового индекса'
+
+    def __str__(self):
+        return self.backend
+
+
+class PostSearchTerm(models.Model):
+    """Запись обратного индекса поиска: основа слова в посте."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Публикация',
+    )
+    term = models.CharField(max_length=64, verbose_name='Основа слова')
+    weight = models.PositiveIntegerField(verbose_name='Вес')
+
+    class Meta:
+        verbose_name = 'слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('term', 'post'),
+                name='post_search_term_unique',
+            ),
+        )
+
+    def __str__(self):
+        return self.term
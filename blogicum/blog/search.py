@@ -0,0 +1,173 @@
+"""Полнотекстовый поиск по постам.
+
+Заголовок и текст поста разбиваются на слова, слова приводятся к основе
+стеммером Snowball (русским для кириллицы, английским для остальных), и
+основы записываются в индекс. Поддерживаются два хранилища индекса:
+
+* ``fts5`` — виртуальная таблица SQLite FTS5, ранжирование по BM25;
+* ``index`` — обратный индекс на модели PostSearchTerm, работающий на
+  любой базе данных, ранжирование по сумме весов слов.
+
+При ``BLOG_SEARCH_BACKEND = 'auto'`` FTS5 выбирается, если таблица
+создана миграцией, иначе используется обратный индекс.
+"""
+import re
+from collections import Counter
+from functools import lru_cache
+
+import snowballstemmer
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+from blog.models import PostSearchTerm
+
+FTS_TABLE = "blog_post_fts"
+TITLE_WEIGHT = 5
+MIN_WORD_LENGTH = 2
+MAX_TERM_LENGTH = 64
+
+WORD_RE = re.compile(r"\w+")
+CYRILLIC_RE = re.compile(r"[а-я]")
+
+_stemmers = {
+    "russian": snowballstemmer.stemmer("russian"),
+    "english": snowballstemmer.stemmer("english"),
+}
+_fts_tables = {}
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Возвращает основу слова."""
+    language = "russian" if CYRILLIC_RE.search(word) else "english"
+    return _stemmers[language].stemWord(word)[:MAX_TERM_LENGTH]
+
+
+def tokenize(text):
+    """Разбивает текст на основы слов в порядке следования."""
+    words = WORD_RE.findall(text.lower().replace("ё", "е"))
+    return [stem(word) for word in words if len(word) >= MIN_WORD_LENGTH]
+
+
+def post_terms(title_terms, text_terms):
+    """Веса основ слов поста: слово из заголовка весит больше."""
+    weights = Counter(text_terms)
+    for term in title_terms:
+        weights[term] += TITLE_WEIGHT
+    return weights
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    """Возвращает имя хранилища индекса для подключения."""
+    backend = settings.BLOG_SEARCH_BACKEND
+    if backend != "auto":
+        return backend
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return "index"
+    key = (using, connection.settings_dict["NAME"])
+    if key not in _fts_tables:
+        _fts_tables[key] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return "fts5" if _fts_tables[key] else "index"
+
+
+def index_posts(posts, using=DEFAULT_DB_ALIAS):
+    """Записывает в индекс переданные посты, заменяя старые записи."""
+    entries = tokenize_rows(
+        (post.pk, post.title, post.text) for post in posts
+    )
+    write_entries(entries, using)
+
+
+def tokenize_rows(rows):
+    """Готовит записи индекса из строк (pk, заголовок, текст)."""
+    return [(pk, tokenize(title), tokenize(text)) for pk, title, text in rows]
+
+
+def write_entries(entries, using=DEFAULT_DB_ALIAS):
+    """Записывает готовые записи индекса (pk, основы заголовка, текста)."""
+    if not entries:
+        return
+    remove_posts([pk for pk, _, _ in entries], using)
+    if get_backend(using) == "fts5":
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, text) "
+                "VALUES (%s, %s, %s)",
+                [
+                    (pk, " ".join(title), " ".join(text))
+                    for pk, title, text in entries
+                ],
+            )
+        return
+    PostSearchTerm.objects.using(using).bulk_create(
+        PostSearchTerm(post_id=pk, term=term, weight=weight)
+        for pk, title, text in entries
+        for term, weight in post_terms(title, text).items()
+    )
+
+
+def remove_posts(pks, using=DEFAULT_DB_ALIAS):
+    """Удаляет посты из индекса."""
+    if get_backend(using) == "fts5":
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk in pks],
+            )
+        return
+    PostSearchTerm.objects.using(using).filter(post_id__in=pks).delete()
+
+
+def clear_index(using=DEFAULT_DB_ALIAS):
+    """Удаляет из индекса все записи."""
+    if get_backend(using) == "fts5":
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        return
+    PostSearchTerm.objects.using(using).all().delete()
+
+
+def search_posts(queryset, query):
+    """Оставляет в queryset посты, содержащие все слова запроса.
+
+    Результат упорядочен по релевантности, затем по дате публикации.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return queryset.none()
+    if get_backend(queryset.db) == "fts5":
+        return _search_fts(queryset, terms)
+    return _search_index(queryset, terms)
+
+
+def _search_fts(queryset, terms):
+    # Таблица FTS5 присоединяется к постам один раз: MATCH выполняется
+    # одним проходом по индексу, а rank берётся из той же строки.
+    expression = " ".join(f'"{term}"' for term in terms)
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        select={"search_rank": f"{FTS_TABLE}.rank"},
+        tables=[FTS_TABLE],
+        where=[
+            f"{FTS_TABLE} MATCH %s",
+            f"{FTS_TABLE}.rowid = {table}.id",
+        ],
+        params=[expression],
+    ).order_by("search_rank", "-pub_date")
+
+
+def _search_index(queryset, terms):
+    matches = PostSearchTerm.objects.filter(term__in=terms)
+    matched_posts = matches.values("post").annotate(
+        matched=Count("term")
+    ).filter(matched=len(terms)).values("post")
+    score = matches.filter(post=OuterRef("pk")).values("post").annotate(
+        score=Sum("weight")
+    ).values("score")
+    return queryset.filter(pk__in=matched_posts).annotate(
+        search_rank=Subquery(score)
+    ).order_by("-search_rank", "-pub_date")
@@ -0,0 +1,193 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import mark_content_changed
+from blog.images import IMAGE_ERRORS, delete_renditions, generate_renditions
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import index_posts, remove_posts
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    """Запоминает исходный пост, чтобы отследить перенос комментария."""
+    instance._initial_post_id = instance.__dict__.get("post_id")
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста."""
+    initial_post_id = instance._initial_post_id
+    if not created and initial_post_id == instance.post_id:
+        return
+    if not created and initial_post_id is not None:
+        Post.objects.change_comment_count(initial_post_id, -1)
+    Post.objects.change_comment_count(instance.post_id, 1)
+    instance._initial_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста."""
+    Post.objects.change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    """Запоминает исходное изображение поста и его размеры."""
+    image = instance.__dict__.get("image")
+    size = None
+    if "image_size" in instance.__dict__:
+        size = instance.image_dimensions
+    instance._initial_image = (getattr(image, "name", image), size)
+
+
+@receiver(pre_save, sender=Post)
+def detect_image_upload(sender, instance, **kwargs):
+    """Отмечает загрузку нового изображения поста.
+
+    Размеры сбрасываются до создания копий нового изображения: по ним
+    шаблоны решают, что копии готовы.
+    """
+    instance._image_uploaded = bool(
+        instance.image and not instance.image._committed
+    )
+    if instance._image_uploaded or not instance.image:
+        instance.image_dimensions = None
+
+
+@receiver(pre_save, sender=Post)
+def update_post_visibility(sender, instance, **kwargs):
+    """Пересчитывает флаг видимости сохраняемого поста."""
+    instance.is_visible = bool(
+        instance.is_published
+        and instance.pub_date <= timezone.now()
+        and instance.category_id is not None
+        and instance.category.is_published
+    )
+
+
+@receiver(post_init, sender=Category)
+def remember_category_publication(sender, instance, **kwargs):
+    """Запоминает исходную публикацию категории."""
+    instance._initial_is_published = instance.__dict__.get("is_published")
+
+
+@receiver(post_save, sender=Category)
+def propagate_category_publication(sender, instance, created, **kwargs):
+    """Пересчитывает видимость постов категории одним запросом."""
+    if created or instance._initial_is_published == instance.is_published:
+        return
+    Post.objects.db_manager(kwargs["using"]).refresh_visibility(
+        category=instance
+    )
+    instance._initial_is_published = instance.is_published
+
+
+@receiver(post_delete, sender=Category)
+def hide_posts_without_category(sender, instance, **kwargs):
+    """Скрывает посты, оставшиеся без удалённой категории."""
+    Post.objects.db_manager(kwargs["using"]).refresh_visibility(
+        category=None, is_visible=True
+    )
+
+
+@receiver(post_save, sender=Post)
+def create_image_renditions(sender, instance, **kwargs):
+    """Создаёт уменьшенные копии только что загруженного изображения.
+
+    Если файл не читается, размеры остаются пустыми и страницы выводят
+    оригинал.
+    """
+    if not getattr(instance, "_image_uploaded", False):
+        return
+    instance._image_uploaded = False
+    try:
+        instance.image_dimensions = generate_renditions(instance.image.name)
+    except IMAGE_ERRORS:
+        logger.exception(
+            "Не удалось создать копии изображения %s", instance.image.name
+        )
+        return
+    Post.objects.filter(pk=instance.pk).update(
+        image_size=instance.image_size
+    )
+
+
+@receiver(post_save, sender=Post)
+def delete_replaced_image_renditions(sender, instance, created, **kwargs):
+    """Удаляет копии заменённого или убранного изображения поста.
+
+    Файлы удаляются после фиксации транзакции и только если изображение
+    больше не используется другими постами.
+    """
+    if "image" not in instance.__dict__:
+        return
+    name, size = instance._initial_image
+    instance._initial_image = (instance.image.name, instance.image_dimensions)
+    if created or not name or name == instance.image.name:
+        return
+    using = kwargs["using"]
+
+    def delete():
+        if not Post.objects.using(using).filter(image=name).exists():
+            delete_renditions(name, size)
+
+    transaction.on_commit(delete, using=using)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields, **kwargs):
+    """Переиндексирует пост при изменении заголовка или текста."""
+    if update_fields and not {"title", "text"} & set(update_fields):
+        return
+    index_posts((instance,), using=kwargs["using"])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Удаляет пост из поискового индекса."""
+    remove_posts((instance.pk,), using=kwargs["using"])
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    """Запоминает исходное имя пользователя."""
+    instance._initial_username = instance.__dict__.get("username")
+
+
+@receiver(post_save, sender=User)
+def invalidate_feeds_on_rename(sender, instance, created, **kwargs):
+    """Сбрасывает кеш лент, если автор сменил имя: оно выводится в
+    карточках постов. Вход пользователя и прочие сохранения кеш не
+    трогают.
+    """
+    if created or instance._initial_username == instance.username:
+        return
+    instance._initial_username = instance.username
+    mark_content_changed(kwargs["using"])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_feeds(sender, using, **kwargs):
+    """Отмечает изменение данных, отображаемых в лентах и на страницах
+    постов.
+    """
+    mark_content_changed(using)
@@ -0,0 +1,37 @@
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from blog.cache import post_card_key
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Пары (пост, отрендеренная карточка) для страницы ленты.
+
+    Карточки всей страницы читаются из кеша одним get_many, недостающие
+    рендерятся и сохраняются одним set_many.
+    """
+    posts = list(posts)
+    timeout = settings.BLOG_POST_CARD_CACHE_TIMEOUT
+    card_template = get_template('includes/post_card.html')
+    if not timeout:
+        return [
+            (post, card_template.render({'post': post})) for post in posts
+        ]
+    cache = caches[settings.BLOG_FEED_CACHE_ALIAS]
+    keys = [post_card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {
+        key: card_template.render({'post': post})
+        for key, post in zip(keys, posts)
+        if key not in cards
+    }
+    if missing:
+        cache.set_many(missing, timeout)
+        cards.update(missing)
+    return [(post, mark_safe(cards[key])) for key, post in zip(keys, posts)]
@@ -0,0 +1,15 @@
+from django import template
+
+from blog.images import responsive_image
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, rendition):
+    """Изображение поста с копиями под разную ширину экрана."""
+    context = responsive_image(
+        post.image, post.image_dimensions, rendition
+    )
+    context['loading'] = 'lazy' if rendition == 'card' else 'eager'
+    return context
@@ -1,27 +1,46 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 
 app_name = 'blog'
 
+
+def read_view(view_class, async_view_class):
+    """Синхронное или асинхронное представление по BLOG_ASYNC_VIEWS."""
+    if settings.BLOG_ASYNC_VIEWS:
+        return async_view_class.as_view()
+    return view_class.as_view()
+
+
 urlpatterns = [
     # Главная страница.
     path(
         '',
-        views.MainPostsListView.as_view(),
+        read_view(views.MainPostsListView, async_views.AsyncMainPostsView),
         name='index'
     ),
     # Страница определенной категории.
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostListView.as_view(),
+        read_view(
+            views.CategoryPostListView, async_views.AsyncCategoryPostsView
+        ),
         name='category_posts'
     ),
+    # Поиск по публикациям.
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
     # Страница профиля пользователя с его публикациями.
     path(
         'profile/<slug:username>/',
-        views.UserProfileListView.as_view(),
+        read_view(
+            views.UserProfileListView, async_views.AsyncUserProfileView
+        ),
         name='profile'
     ),
     # Страница редактирования данных профиля пользователя.
@@ -33,7 +52,7 @@ urlpatterns = [
     # Страница поста.
     path(
         'posts/<int:pk>/',
-        views.PostDetailView.as_view(),
+        read_view(views.PostDetailView, async_views.AsyncPostDetailView),
         name='post_detail'
     ),
     # Страница создания поста.
@@ -54,6 +73,12 @@ urlpatterns = [
         views.DeletePostView.as_view(),
         name='delete_post',
     ),
+    # Следующая порция комментариев поста.
+    path(
+        'posts/<int:pk>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
     # Добавление комментария.
     path(
         'posts/<int:pk>/comment/',
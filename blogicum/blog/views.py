@@ -1,8 +1,9 @@
-from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import send_mail
+from django.db import transaction
+from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -12,22 +13,34 @@ from django.views.generic import (
 )
 
 from blog.forms import CommentForm, PostForm, UserEditForm
-from blog.models import Category, Comment, Post, User
+from blog.models import (
+    Category, Comment, CommentDigest, OutgoingEmail, Post, User
+)
+from blog.search import search_posts
 from constants import PAGINATION_QTY
 from core.mixins import (
     CommentMixinView,
+    CommentsPageMixin,
+    ConditionalGetMixin,
+    FeedCacheMixin,
+    KeysetPaginationMixin,
     NotAuthorRedirectMixin,
+    PostDetailQuerySetMixin,
     PostQuerySetMixin,
 )
+from core.writes import run_write
 
 
-class MainPostsListView(ListView):
+class MainPostsListView(
+    ConditionalGetMixin, FeedCacheMixin, KeysetPaginationMixin, ListView
+):
     """Главная страница с постами."""
 
     model = Post
     template_name = 'blog/index.html'
     queryset = Post.objects.post_published_query()
     paginate_by = PAGINATION_QTY
+    query_budget = 5
 
 
 class CategoryPostListView(MainPostsListView):
@@ -35,12 +48,13 @@ class CategoryPostListView(MainPostsListView):
 
     template_name = "blog/category.html"
     category = None
+    query_budget = 6
 
     def get_queryset(self):
-        slug = self.kwargs["category_slug"]
-        self.category = get_object_or_404(
-            Category, slug=slug, is_published=True
-        )
+        if self.category is None:
+            self.category = get_object_or_404(
+                Category, slug=self.kwargs["category_slug"], is_published=True
+            )
         return super().get_queryset().filter(category=self.category)
 
     def get_context_data(self, **kwargs):
@@ -49,11 +63,23 @@ class CategoryPostListView(MainPostsListView):
         return context
 
 
-class UserProfileListView(PostQuerySetMixin, ListView):
+class UserProfileListView(
+    ConditionalGetMixin,
+    FeedCacheMixin,
+    KeysetPaginationMixin,
+    PostQuerySetMixin,
+    ListView,
+):
     """Страница с информацией о пользователе и списком его публикаций."""
 
     template_name = "blog/profile.html"
     paginate_by = PAGINATION_QTY
+    query_budget = 6
+
+    def get_feed_scope(self):
+        if self.get_author() == self.request.user:
+            return "author"
+        return super().get_feed_scope()
 
     def get_context_data(self, **kwargs):
         """Добавление данных о профиле в контекст."""
@@ -62,19 +88,67 @@ class UserProfileListView(PostQuerySetMixin, ListView):
         return context
 
 
-class PostDetailView(PostQuerySetMixin, DetailView):
+class PostSearchView(ListView):
+    """Поиск по заголовкам и текстам опубликованных постов."""
+
+    template_name = "blog/search.html"
+    paginate_by = PAGINATION_QTY
+    query_budget = 3
+
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def get_queryset(self):
+        return search_posts(
+            Post.objects.post_published_query(), self.get_search_query()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context["query"] = query
+        if query:
+            context["page_params"] = urlencode({"q": query}) + "&"
+        return context
+
+
+class PostDetailView(
+    ConditionalGetMixin,
+    PostDetailQuerySetMixin,
+    CommentsPageMixin,
+    DetailView,
+):
     """Страница выбранного поста."""
 
     model = Post
     template_name = "blog/detail.html"
+    query_budget = 4
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        self.remember_content_change(post)
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["flag"] = True
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.all().select_related(
-            "author"
-        )
+        context["comments"] = self.get_comments_page(self.object)
+        return context
+
+
+class PostCommentsView(CommentsPageMixin, DetailView):
+    """Следующая порция комментариев поста для подгрузки на страницу."""
+
+    template_name = "includes/comments.html"
+
+    def get_queryset(self):
+        return Post.objects.post_visible_to(self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["fragment"] = True
+        context["comments"] = self.get_comments_page(self.object)
         return context
 
 
@@ -84,6 +158,7 @@ class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "blog/user.html"
     model = User
     form_class = UserEditForm
+    query_budget = 2
 
     def get_object(self, queryset=None):
         return self.request.user
@@ -99,6 +174,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = "blog/create.html"
+    query_budget = 4
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -115,12 +191,14 @@ class EditPostView(LoginRequiredMixin, NotAuthorRedirectMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = "blog/create.html"
+    query_budget = 5
 
 
 class DeletePostView(LoginRequiredMixin, NotAuthorRedirectMixin, DeleteView):
     """Удаление поста."""
 
     model = Post
+    queryset = Post.objects.select_related("location")
     template_name = "blog/create.html"
 
     def get_context_data(self, **kwargs):
@@ -139,20 +217,31 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
     template_name = "blog/comment.html"
+    query_budget = 9
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        post = Post.objects.get_post_data(self.kwargs['pk'])
-        form.instance.post = post
-        if post.author != self.request.user:
-            self.send_author_email(post)
-        return super().form_valid(form)
+        form.instance.post = Post.objects.get_post_data(self.kwargs['pk'])
+        self.object = run_write(self.save_comment, form)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def save_comment(self, form):
+        """Сохраняет комментарий и ставит письмо автору поста в очередь.
+
+        Выполняется в транзакции, возможно в потоке координатора записи.
+        """
+        comment = form.save()
+        if comment.post.author != self.request.user:
+            self.send_author_email(comment.post)
+        return comment
 
     def get_success_url(self):
         pk = self.kwargs["pk"]
         return reverse("blog:post_detail", kwargs={"pk": pk})
 
     def send_author_email(self, post):
+        if CommentDigest.objects.filter(author=post.author).exists():
+            return
         post_url = self.request.build_absolute_uri(self.get_success_url())
         recipient_email = post.author.email
         subject = "New comment"
@@ -161,12 +250,10 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
             f"комментарий к посту {post.title}.\n"
             f"Читать комментарий {post_url}"
         )
-        send_mail(
+        OutgoingEmail.objects.enqueue(
             subject=subject,
             message=message,
-            from_email=settings.EMAIL_FROM,
-            recipient_list=[recipient_email],
-            fail_silently=True,
+            recipient=recipient_email,
         )
 
 
@@ -174,7 +261,14 @@ class EditCommentView(CommentMixinView, UpdateView):
     """Редактирование комментария."""
 
     form_class = CommentForm
+    query_budget = 4
 
 
 class DeleteCommentView(CommentMixinView, DeleteView):
     """Удаление комментария."""
+
+    query_budget = 7
+
+    @transaction.atomic
+    def form_valid(self, form):
+        return super().form_valid(form)
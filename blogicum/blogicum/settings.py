@@ -1,4 +1,5 @@
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,6 +26,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryInstrumentationMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,6 +59,20 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# Подсчёт SQL-запросов по представлениям, см. core.middleware.
+QUERY_INSTRUMENTATION = DEBUG
+# Падать, если представление превысило свой query_budget.
+QUERY_BUDGET_STRICT = False
+
+# Компилировать все шаблоны при запуске wsgi/asgi-приложения.
+BLOG_WARM_TEMPLATES = False
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -63,6 +80,39 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: пути к копиям базы через запятую в переменной
+# окружения BLOG_DB_REPLICAS. Копии обновляет команда sync_replicas.
+# Лента, отрендеренная по отстающей реплике, попадает в кеш лент под
+# номером отметки изменения из той же реплики, поэтому после
+# синхронизации не используется: отставание ограничено интервалом
+# запуска sync_replicas.
+BLOG_DB_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.environ.get('BLOG_DB_REPLICAS', '').split(','))
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{Path(path.strip()).resolve()}?mode=ro',
+        'OPTIONS': {'uri': True},
+        'TEST': {'MIRROR': 'default'},
+    }
+    BLOG_DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Сколько секунд после изменяющего запроса клиент читает из основной
+# базы: должно покрывать интервал запуска sync_replicas.
+BLOG_DB_PIN_COOKIE = 'db_pin'
+BLOG_DB_PIN_SECONDS = 30
+
+# Запись комментариев через один поток с групповой фиксацией, см.
+# core.writes. Имеет смысл для SQLite под параллельной записью.
+BLOG_WRITE_COORDINATOR = False
+BLOG_WRITE_BATCH_SIZE = 64
+# Сколько секунд собирать пачку после первой записи в ней.
+BLOG_WRITE_BATCH_WAIT = 0
+BLOG_WRITE_TIMEOUT = 30
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -109,3 +159,48 @@ MEDIA_ROOT = BASE_DIR / 'media/'
 MEDIA_URL = '/media/'
 
 EMAIL_FROM = 'from@pochta.com'
+
+# Очередь исходящих писем, см. команду send_queued_mail.
+BLOG_MAIL_BATCH_SIZE = 100
+BLOG_MAIL_MAX_ATTEMPTS = 5
+# Задержка перед повтором, секунды; удваивается с каждой попыткой.
+BLOG_MAIL_RETRY_DELAY = 60
+# Сколько секунд взятое в отправку письмо недоступно другим обработчикам.
+BLOG_MAIL_CLAIM_TIMEOUT = 300
+
+# Адрес сайта для ссылок в письмах, которые формируются вне запроса.
+BLOG_SITE_URL = 'http://127.0.0.1:8000'
+# Как часто, в секундах, авторы со сводкой получают письмо о комментариях.
+BLOG_DIGEST_WINDOW = 60 * 60
+
+# Ширины уменьшенных копий изображений постов для srcset, пиксели.
+BLOG_IMAGE_WIDTHS = (320, 640, 960, 1280)
+BLOG_IMAGE_QUALITY = 82
+# Ширина копии, подставляемой в src, для каждого места на странице.
+BLOG_IMAGE_RENDITIONS = {
+    'card': 640,
+    'detail': 1280,
+}
+BLOG_IMAGE_SIZES = {
+    'card': '(max-width: 40rem) 100vw, 40rem',
+    'detail': '(max-width: 40rem) 100vw, 40rem',
+}
+
+# 'offset' — нумерованные страницы, 'keyset' — курсорная пагинация лент.
+BLOG_FEED_PAGINATION = 'offset'
+
+# Асинхронные представления лент и страницы поста из blog.async_views.
+# Имеет смысл только при запуске через ASGI (blogicum.asgi).
+BLOG_ASYNC_VIEWS = False
+
+# Кеш отрендеренных лент. Время жизни ограничивает задержку появления
+# отложенных постов: наступление pub_date не сбрасывает кеш.
+BLOG_FEED_CACHE_ALIAS = 'default'
+BLOG_FEED_CACHE_TIMEOUT = 60
+# Карточки постов кешируются в том же хранилище под ключом с хешем их
+# содержимого; устаревшие карточки просто истекают. 0 отключает кеш.
+BLOG_POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Хранилище поискового индекса: 'fts5' — таблица SQLite FTS5, 'index' —
+# обратный индекс на модели PostSearchTerm, 'auto' — FTS5, если доступна.
+BLOG_SEARCH_BACKEND = 'auto'
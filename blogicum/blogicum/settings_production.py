@@ -0,0 +1,59 @@
+"""Настройки для боевого окружения.
+
+Запуск: DJANGO_SETTINGS_MODULE=blogicum.settings_production.
+"""
+import os
+from copy import deepcopy
+
+from .settings import *  # noqa: F401, F403
+from .settings import BLOG_DB_REPLICAS, DATABASES, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['debug'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Компилировать шаблоны при запуске процесса, до первого запроса.
+BLOG_WARM_TEMPLATES = True
+QUERY_INSTRUMENTATION = False
+
+# SQLite под конкурентной нагрузкой. WAL позволяет читать во время
+# записи, synchronous=NORMAL в режиме WAL не теряет целостность при сбое
+# процесса, только последние транзакции при отключении питания.
+# Транзакции IMMEDIATE сразу берут блокировку записи и ждут её timeout
+# секунд (busy_timeout), а не падают с «database is locked» при попытке
+# повысить блокировку чтения до записи.
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    # Отрицательное значение — размер в КиБ на соединение: 64 МиБ.
+    'PRAGMA cache_size=-65536',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA temp_store=MEMORY',
+)
+DATABASES = deepcopy(DATABASES)
+DATABASES['default'].update({
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'init_command': ';'.join(SQLITE_PRAGMAS),
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,
+    },
+})
+# Реплики открываются заново на каждый запрос: sync_replicas подменяет
+# файл, и постоянное соединение читало бы старую копию.
+for alias in BLOG_DB_REPLICAS:
+    DATABASES[alias]['OPTIONS'] = {
+        **DATABASES[alias]['OPTIONS'],
+        'init_command': ';'.join(SQLITE_PRAGMAS[2:]),
+    }
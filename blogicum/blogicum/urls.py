@@ -5,6 +5,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from core.views import query_stats_view
+
 handler404 = 'pages.views.handler404'
 handler500 = 'pages.views.handler500'
 
@@ -24,6 +26,11 @@ urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
 ]
 
+if settings.QUERY_INSTRUMENTATION:
+    urlpatterns.insert(
+        0, path('debug/query-stats/', query_stats_view, name='query_stats')
+    )
+
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
@@ -1,2 +1,3 @@
 PAGINATION_QTY = 10
 LIMIT = 30
+COMMENTS_PAGE_SIZE = 20
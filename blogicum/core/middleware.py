@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, nullcontext
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.routers import get_replicas, use_replicas
+
+logger = logging.getLogger('blogicum.queries')
+
+SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestQueries:
+    """Счётчик SQL-запросов одного HTTP-запроса."""
+
+    def __init__(self):
+        self.count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.count += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicates(self):
+        """Сколько запросов повторили уже выполненный с теми же параметрами."""
+        return sum(n - 1 for n in self.statements.values())
+
+
+class QueryStatsRegistry:
+    """Накопленная статистика запросов по именам представлений."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(Counter)
+
+    def record(self, view_name, queries, over_budget):
+        with self._lock:
+            stats = self._views[view_name]
+            stats['requests'] += 1
+            stats['queries'] += queries.count
+            stats['duplicates'] += queries.duplicates
+            stats['sql_ms'] += queries.sql_time * 1000
+            stats['render_ms'] += queries.render_time * 1000
+            stats['over_budget'] += over_budget
+            stats['max_queries'] = max(stats['max_queries'], queries.count)
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: dict(stats) for name, stats in self._views.items()}
+        for stats in views.values():
+            requests = stats['requests']
+            for key in ('queries', 'duplicates', 'sql_ms', 'render_ms'):
+                stats[f'avg_{key}'] = round(stats.pop(key) / requests, 3)
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+query_stats = QueryStatsRegistry()
+
+
+def get_query_budget(resolver_match):
+    """Бюджет запросов, объявленный у представления атрибутом query_budget."""
+    if resolver_match is None:
+        return None
+    view = getattr(resolver_match.func, 'view_class', resolver_match.func)
+    return getattr(view, 'query_budget', None)
+
+
+class QueryInstrumentationMiddleware:
+    """Считает SQL-запросы, их время и время рендеринга шаблона.
+
+    Результат добавляется в заголовки ответа Server-Timing и
+    X-Query-Count и накапливается в query_stats по имени представления.
+    Должен стоять первым в MIDDLEWARE, чтобы учитывать запросы
+    остальных middleware и засекать рендеринг непосредственно перед ним.
+    Работает и в синхронной, и в асинхронной цепочке middleware, поэтому
+    не переводит асинхронные представления в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with self.count_queries(request):
+            response = self.get_response(request)
+        return self.report(request, response, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        # Соединения с базой свои у каждого потока, а асинхронный ORM
+        # выполняет запросы в потоке запроса: счётчик подключается там же.
+        counting = await sync_to_async(self.count_queries)(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(counting.close)()
+        return self.report(request, response, started)
+
+    def count_queries(self, request):
+        """Подключает счётчик запросов ко всем соединениям с базой
+        текущего потока.
+        """
+        queries = RequestQueries()
+        request._queries = queries
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(queries))
+        return stack
+
+    def report(self, request, response, started):
+        """Добавляет статистику в заголовки ответа и в query_stats."""
+        queries = request._queries
+        total = time.perf_counter() - started
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        budget = get_query_budget(match)
+        over_budget = budget is not None and queries.count > budget
+        query_stats.record(view_name, queries, over_budget)
+
+        response['X-Query-Count'] = queries.count
+        response['X-Duplicate-Queries'] = queries.duplicates
+        response['Server-Timing'] = (
+            f'sql;dur={queries.sql_time * 1000:.2f};'
+            f'desc="{queries.count} queries", '
+            f'render;dur={queries.render_time * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        if over_budget:
+            message = (
+                f'{view_name}: {queries.count} SQL-запросов при бюджете '
+                f'{budget}'
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def stop_timer(response):
+            request._queries.render_time += time.perf_counter() - started
+
+        response.add_post_render_callback(stop_timer)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Пускает безопасные запросы читать с реплик.
+
+    Изменяющий запрос читает из основной базы и ставит cookie, с которой
+    следующие BLOG_DB_PIN_SECONDS секунд клиент тоже читает оттуда.
+    Работает и в синхронной, и в асинхронной цепочке middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.reads_for(request):
+            response = self.get_response(request)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        with self.reads_for(request):
+            response = await self.get_response(request)
+        return self.pin(request, response)
+
+    def reads_for(self, request):
+        if (
+            request.method in SAFE_METHODS
+            and settings.BLOG_DB_PIN_COOKIE not in request.COOKIES
+        ):
+            return use_replicas()
+        return nullcontext()
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 500:
+            response.set_cookie(
+                settings.BLOG_DB_PIN_COOKIE,
+                '1',
+                max_age=settings.BLOG_DB_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
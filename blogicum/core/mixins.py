@@ -1,26 +1,64 @@
+import hashlib
+import time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Subquery
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.views import View
 
-from blog.models import Comment, Post
+from blog.cache import feed_cache_key
+from blog.models import Comment, ContentChange, Post
+from constants import COMMENTS_PAGE_SIZE
+from core.paginators import InvalidCursor, KeysetPaginator
 
 
 User = get_user_model()
 
+# Заголовки, с которыми клиент проверяет сохранённую копию страницы.
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class MemoizedObjectMixin:
+    """Объект представления загружается одним запросом и запоминается."""
+
+    _object = None
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if self._object is None:
+            self._object = super().get_object()
+        return self._object
+
+
+class NotAuthorRedirectMixin(MemoizedObjectMixin):
+    """Доступ к редактированию и удалению только для автора объекта.
+
+    Проверка автора в dispatch и обработчики UpdateView/DeleteView
+    работают с одним и тем же экземпляром объекта.
+    """
 
-class CommentMixinView(View):
+    def dispatch(self, request, *args, **kwargs):
+        if self.get_object().author_id != request.user.pk:
+            return redirect("blog:post_detail", pk=self.kwargs["pk"])
+        return super().dispatch(request, *args, **kwargs)
+
+
+class CommentMixinView(NotAuthorRedirectMixin, View):
     """Миксин для редактирования и удаления комментария."""
 
     model = Comment
     template_name = "blog/comment.html"
     pk_url_kwarg = "comment_pk"
 
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect("blog:post_detail", pk=self.kwargs["pk"])
-        Post.objects.get_post_data(self.kwargs["pk"])
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        """Комментарий ищется только среди комментариев поста из URL."""
+        return Comment.objects.filter(post_id=self.kwargs["pk"])
 
     def get_success_url(self):
         pk = self.kwargs["pk"]
@@ -29,7 +67,6 @@ class CommentMixinView(View):
 
 class PostQuerySetMixin:
     author = None
-    post_data = None
 
     def get_author(self):
         """Получение объекта автора по username из URL, если доступен."""
@@ -41,25 +78,9 @@ class PostQuerySetMixin:
                 self.author = self.request.user
         return self.author
 
-    def get_post_data(self):
-        """Получение данных поста по pk."""
-        if self.post_data is None:
-            pk = self.kwargs.get('pk')
-            if pk:
-                self.post_data = get_object_or_404(Post, pk=pk)
-        return self.post_data
-
     def get_queryset(self):
-        """Получение queryset для постов."""
+        """Получение queryset для постов автора."""
         author = self.get_author()
-        post_data = self.get_post_data()
-
-        if post_data:
-            if post_data.author == self.request.user:
-                return Post.objects.post_all_query().filter(pk=post_data.pk)
-            return Post.objects.post_published_query().filter(
-                pk=post_data.pk
-            )
         if author == self.request.user:
             return Post.objects.post_all_query().filter(author=author)
         return Post.objects.post_published_query().filter(
@@ -67,9 +88,182 @@ class PostQuerySetMixin:
         )
 
 
-class NotAuthorRedirectMixin:
+class PostDetailQuerySetMixin:
+    """Посты, доступные пользователю, с отметкой изменения данных.
 
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect("blog:post_detail", pk=self.kwargs["pk"])
-        return super().dispatch(request, *args, **kwargs)
+    Отметка ContentChange приходит в том же запросе, что и пост, поэтому
+    страница поста без условных заголовков обходится без отдельного
+    запроса за ней.
+    """
+
+    def get_queryset(self):
+        changes = ContentChange.objects.filter(pk=ContentChange.objects.PK)
+        return Post.objects.post_visible_to(self.request.user).annotate(
+            content_version=Subquery(changes.values("version")),
+            content_changed_at=Subquery(changes.values("changed_at")),
+        )
+
+
+class ConditionalGetMixin:
+    """Ответ 304 на повторный GET неизменившейся страницы.
+
+    Страница не изменилась, если с прошлого ответа не сдвинулась отметка
+    ContentChange, а пользователь и адрес те же. Отметку сдвигает любое
+    изменение постов, комментариев, категорий, местоположений и имён
+    авторов, в том числе удаление; она хранится в базе и одинакова во
+    всех процессах.
+
+    Без условных заголовков отметка до рендеринга не читается: ETag
+    ответа строится по значению, с которым страница отрендерена.
+    """
+
+    content_change = None
+
+    def get_content_change(self):
+        """Версия и время последнего изменения данных страницы.
+
+        Читается один раз за запрос, если представление не получило её
+        вместе со своими данными.
+        """
+        if self.content_change is None:
+            self.content_change = ContentChange.objects.current()
+        return self.content_change
+
+    async def aget_content_change(self):
+        """Асинхронный вариант get_content_change()."""
+        if self.content_change is None:
+            self.content_change = await ContentChange.objects.acurrent()
+        return self.content_change
+
+    def remember_content_change(self, obj):
+        """Запоминает отметку, загруженную вместе с объектом страницы."""
+        self.content_change = (obj.content_version or 0,
+                               obj.content_changed_at)
+
+    def get(self, request, *args, **kwargs):
+        if any(name in request.headers for name in CONDITIONAL_HEADERS):
+            etag, last_modified = self.get_conditional_state(request)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is not None:
+                return self.patch_conditional_headers(
+                    request, response, etag, last_modified
+                )
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        etag, last_modified = self.get_conditional_state(request)
+        return self.patch_conditional_headers(
+            request, response, etag, last_modified
+        )
+
+    def get_conditional_state(self, request):
+        """Возвращает ETag и время изменения страницы в секундах.
+
+        Время изменения не отдаётся, пока не прошла секунда, в которую
+        оно случилось: следующее изменение в ту же секунду не сдвинуло бы
+        Last-Modified, и If-Modified-Since получил бы устаревший 304.
+        """
+        version, changed_at = self.get_content_change()
+        state = (version, request.user.pk, request.get_full_path())
+        digest = hashlib.md5(
+            repr(state).encode(), usedforsecurity=False
+        ).hexdigest()
+        last_modified = None
+        if changed_at is not None:
+            seconds = int(changed_at.timestamp())
+            if seconds < int(time.time()):
+                last_modified = seconds
+        return f'W/"{digest}"', last_modified
+
+    def patch_conditional_headers(self, request, response, etag,
+                                  last_modified):
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        if request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация ленты вместо постраничной по OFFSET.
+
+    Включается настройкой BLOG_FEED_PAGINATION = "keyset".
+    """
+
+    cursor_kwarg = "cursor"
+    keyset_ordering = ("-pub_date", "-pk")
+
+    def paginate_queryset(self, queryset, page_size):
+        if settings.BLOG_FEED_PAGINATION != "keyset":
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Некорректный курсор страницы.")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class FeedCacheMixin:
+    """Передаёт в шаблон параметры кеширования отрендеренной ленты.
+
+    Используется вместе с ConditionalGetMixin: ключ содержит номер
+    отметки изменения, по которой строится ETag ответа.
+    """
+
+    def get(self, request, *args, **kwargs):
+        # Отметка читается раньше данных ленты: сохранённая в кеше лента
+        # может оказаться новее своего ETag, но не старее.
+        self.get_content_change()
+        return super().get(request, *args, **kwargs)
+
+    def get_feed_scope(self):
+        """Группа зрителей, которым показывается одна и та же лента."""
+        return "public"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["feed_cache"] = {
+            "alias": settings.BLOG_FEED_CACHE_ALIAS,
+            "timeout": settings.BLOG_FEED_CACHE_TIMEOUT,
+            "key": feed_cache_key(
+                self.request,
+                self.get_feed_scope(),
+                self.get_content_change()[0],
+            ),
+        }
+        return context
+
+
+class CommentsPageMixin:
+    """Порция комментариев поста с курсорной пагинацией."""
+
+    comments_per_page = COMMENTS_PAGE_SIZE
+
+    def get_comments_paginator(self, post):
+        return KeysetPaginator(
+            post.comments.select_related("author"),
+            self.comments_per_page,
+            ("created_at", "pk"),
+        )
+
+    def get_comments_page(self, post):
+        try:
+            return self.get_comments_paginator(post).page(
+                self.request.GET.get("cursor")
+            )
+        except InvalidCursor:
+            raise Http404("Некорректный курсор комментариев.")
+
+    async def aget_comments_page(self, post):
+        try:
+            return await self.get_comments_paginator(post).apage(
+                self.request.GET.get("cursor")
+            )
+        except InvalidCursor:
+            raise Http404("Некорректный курсор комментариев.")
@@ -0,0 +1,160 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации.
+
+    Повторяет интерфейс django.core.paginator.Page там, где это возможно
+    без подсчёта общего количества объектов.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки вместо OFFSET.
+
+    Каждая страница выбирается условием «после/до граничного ключа»,
+    поэтому её стоимость не зависит от номера страницы, а общее
+    количество объектов не считается. Все поля ordering должны
+    сортироваться в одном направлении, последнее поле — уникальное.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+        self.descending = self.ordering[0].startswith('-')
+
+    def page(self, cursor=None):
+        """Возвращает страницу, на которую указывает курсор."""
+        queryset, forward, has_previous = self._query(cursor)
+        return self._make_page(list(queryset), forward, has_previous)
+
+    async def apage(self, cursor=None):
+        """Асинхронный вариант page()."""
+        queryset, forward, has_previous = self._query(cursor)
+        objects = [obj async for obj in queryset]
+        return self._make_page(objects, forward, has_previous)
+
+    def encode_cursor(self, direction, obj):
+        key = [
+            self._get_field(name).value_to_string(obj)
+            for name in self.fields
+        ]
+        raw = json.dumps([direction, key], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, key = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            # encode_cursor() пишет ключ строками: null или число в
+            # курсоре дошли бы до фильтра и сломали запрос.
+            if len(key) != len(self.fields) or not all(
+                isinstance(value, str) for value in key
+            ):
+                raise ValueError(key)
+            return direction, [
+                self._get_field(name).to_python(value)
+                for name, value in zip(self.fields, key)
+            ]
+        except (
+            binascii.Error, ValueError, TypeError, ValidationError
+        ) as error:
+            raise InvalidCursor(cursor) from error
+
+    def _query(self, cursor):
+        """Запрос страницы: срез на один объект больше размера страницы,
+        чтобы узнать, есть ли следующая.
+
+        Возвращает запрос, направление и признак предыдущей страницы,
+        если он известен без выполнения запроса.
+        """
+        if not cursor:
+            queryset, forward, has_previous = self.queryset, True, False
+        else:
+            direction, key = self.decode_cursor(cursor)
+            forward = direction == self.NEXT
+            queryset = self.queryset.filter(self._seek(key, forward))
+            has_previous = forward
+        ordering = self.ordering if forward else self._reversed_ordering()
+        queryset = queryset.order_by(*ordering)[:self.per_page + 1]
+        return queryset, forward, has_previous
+
+    def _make_page(self, objects, forward, has_previous):
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if forward:
+            has_next = has_more
+        else:
+            # Назад выбирали в обратном порядке: лишний объект означает
+            # предыдущую страницу, а следующая есть всегда.
+            objects = objects[::-1]
+            has_next, has_previous = bool(objects), has_more
+        return KeysetPage(
+            objects,
+            self,
+            self.encode_cursor(self.NEXT, objects[-1]) if has_next else None,
+            self.encode_cursor(self.PREVIOUS, objects[0])
+            if has_previous and objects else None,
+        )
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def _seek(self, key, forward):
+        """Условие «строго после ключа» в порядке сортировки."""
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            equal = dict(zip(self.fields[:index], key[:index]))
+            condition |= Q(**equal, **{f'{name}__{lookup}': key[index]})
+        return condition
+
+    def _get_field(self, name):
+        meta = self.queryset.model._meta
+        return meta.pk if name == 'pk' else meta.get_field(name)
@@ -0,0 +1,71 @@
+"""Чтение с реплик SQLite и запись в основную базу.
+
+Реплики — копии основной базы, которые обновляет команда sync_replicas,
+поэтому они отстают от неё. С реплик читают только безопасные
+HTTP-запросы, которые пропускает core.middleware.ReplicaPinMiddleware;
+чтобы автор сразу видел свой комментарий, после изменяющего запроса
+она на несколько секунд закрепляет чтения клиента за основной базой.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Приложения, которые всегда читаются из основной базы: сессия и
+# пользователь должны быть актуальны сразу после входа и выхода.
+PRIMARY_APPS = frozenset(('admin', 'auth', 'contenttypes', 'sessions'))
+
+_read_alias = ContextVar('read_alias', default=DEFAULT_DB_ALIAS)
+
+
+def get_replicas():
+    return list(settings.BLOG_DB_REPLICAS)
+
+
+@contextmanager
+def _reading_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def use_replicas():
+    """Читает модели блога внутри блока с одной случайной реплики.
+
+    Все запросы блока видят один снимок данных. Вне такого блока,
+    например в командах и сигналах, чтения идут в основную базу.
+    """
+    replicas = get_replicas()
+    return _reading_from(
+        random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+    )
+
+
+def use_primary():
+    """Направляет все чтения внутри блока в основную базу."""
+    return _reading_from(DEFAULT_DB_ALIAS)
+
+
+class ReplicaRouter:
+    """Чтения моделей блога отдаёт реплике, выбранной use_replicas(),
+    запись и миграции оставляет основной базе.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же строки, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
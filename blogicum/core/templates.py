@@ -0,0 +1,40 @@
+"""Прогрев кеша скомпилированных шаблонов."""
+import time
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def iter_template_names(directory):
+    """Имена всех шаблонов в каталоге относительно него."""
+    directory = Path(directory)
+    for path in sorted(directory.rglob('*')):
+        if path.is_file() and path.suffix in TEMPLATE_SUFFIXES:
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_templates():
+    """Компилирует все шаблоны проекта через загрузчики движков.
+
+    При включённом cached.Loader скомпилированные шаблоны остаются в
+    памяти процесса, и первые запросы не тратят время на разбор.
+    Возвращает список пар (имя шаблона, время компиляции в секундах)
+    и список ошибок.
+    """
+    compiled, errors = [], []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            for name in iter_template_names(directory):
+                started = time.perf_counter()
+                try:
+                    engine.get_template(name)
+                except TemplateSyntaxError as error:
+                    errors.append((name, error))
+                    continue
+                compiled.append((name, time.perf_counter() - started))
+    return compiled, errors
@@ -0,0 +1,12 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from core.middleware import query_stats
+
+
+@staff_member_required
+def query_stats_view(request):
+    """Статистика SQL-запросов по представлениям."""
+    if request.method == 'POST':
+        query_stats.reset()
+    return JsonResponse(query_stats.snapshot())
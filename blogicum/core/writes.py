@@ -0,0 +1,166 @@
+"""Запись в SQLite через один поток с групповой фиксацией.
+
+SQLite допускает одного писателя: потоки, пишущие одновременно, ждут
+блокировку и тратят время на повторы. Координатор выполняет функции
+записи в собственном потоке и соединении. Пока фиксируется одна пачка,
+новые записи копятся в очереди, и следующая пачка фиксируется одной
+транзакцией, то есть одним сбросом на диск на всю пачку. Каждая
+функция выполняется в своей точке сохранения: ошибка одной записи не
+откатывает остальные. Результат или исключение возвращаются вызвавшему
+потоку после фиксации, поэтому он сразу видит свою запись.
+"""
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_STOP = object()
+
+
+class WriteCoordinator:
+    """Поток, выполняющий функции записи пачками до batch_size штук.
+
+    batch_wait — сколько секунд собирать пачку после первой записи;
+    при нуле в пачку попадает то, что накопилось за прошлую фиксацию.
+    """
+
+    def __init__(self, batch_size=64, batch_wait=0.0,
+                 using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.using = using
+        self.stats = Counter()
+        self._jobs = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, function, *args, **kwargs):
+        """Ставит запись в очередь и возвращает Future с её результатом."""
+        future = Future()
+        self._jobs.put((future, function, args, kwargs))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='write-coordinator', daemon=True
+                )
+                self._thread.start()
+        return future
+
+    def close(self):
+        """Выполняет уже поставленные записи и останавливает поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._jobs.put(_STOP)
+            thread.join()
+
+    def _run(self):
+        connection = connections[self.using]
+        try:
+            while (batch := self._next_batch()) is not None:
+                self._commit(connection, batch)
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        job = self._jobs.get()
+        if job is _STOP:
+            return None
+        batch = [job]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                job = self._jobs.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except queue.Empty:
+                break
+            if job is _STOP:
+                # Остановимся после этой пачки.
+                self._jobs.put(_STOP)
+                break
+            batch.append(job)
+        return batch
+
+    def _commit(self, connection, batch):
+        try:
+            connection.close_if_unusable_or_obsolete()
+            with transaction.atomic(using=self.using):
+                outcomes = list(self._execute(batch))
+        except Exception as error:
+            # Фиксация не удалась: не записалось ничего из пачки.
+            self.stats['failed_batches'] += 1
+            for future, *_ in batch:
+                if future.running() or future.set_running_or_notify_cancel():
+                    future.set_exception(error)
+            return
+        self.stats['batches'] += 1
+        self.stats['writes'] += len(outcomes)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _execute(self, batch):
+        """Выполняет записи пачки, каждую в своей точке сохранения."""
+        for future, function, args, kwargs in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with transaction.atomic(using=self.using):
+                    result = function(*args, **kwargs)
+            except Exception as error:
+                yield future, None, error
+            else:
+                yield future, result, None
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_coordinator():
+    """Координатор процесса, создаётся при первой записи."""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = WriteCoordinator(
+                batch_size=settings.BLOG_WRITE_BATCH_SIZE,
+                batch_wait=settings.BLOG_WRITE_BATCH_WAIT,
+            )
+            atexit.register(_coordinator.close)
+        return _coordinator
+
+
+def shutdown():
+    """Останавливает координатор процесса, дождавшись его записей."""
+    global _coordinator
+    with _coordinator_lock:
+        coordinator, _coordinator = _coordinator, None
+    if coordinator is not None:
+        atexit.unregister(coordinator.close)
+        coordinator.close()
+
+
+def run_write(function, *args, **kwargs):
+    """Выполняет функцию записи в транзакции основной базы.
+
+    При BLOG_WRITE_COORDINATOR запись уходит координатору, и вызов ждёт
+    её фиксации не дольше BLOG_WRITE_TIMEOUT секунд. Внутри открытой
+    транзакции функция выполняется на месте: координатор ждал бы
+    блокировку, которую держит эта транзакция.
+    """
+    if (
+        not settings.BLOG_WRITE_COORDINATOR
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+    ):
+        with transaction.atomic():
+            return function(*args, **kwargs)
+    future = get_coordinator().submit(function, *args, **kwargs)
+    return future.result(timeout=settings.BLOG_WRITE_TIMEOUT)
@@ -0,0 +1,13 @@
+import pytest
+
+from blog.generator import BlogDataGenerator
+
+GENERATED_SEED = 20240812
+
+
+@pytest.fixture
+def generated_blog(db):
+    """Небольшой блог с неравномерными синтетическими данными."""
+    return BlogDataGenerator(seed=GENERATED_SEED).generate(
+        users=10, categories=3, locations=5, posts=60, comments=300,
+    )
@@ -0,0 +1,135 @@
+import importlib
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings as django_settings
+from django.test import override_settings
+from django.urls import clear_url_caches, resolve
+
+from blog import async_views
+from conftest import N_PER_PAGE
+
+
+def reload_urlconf():
+    import blog.urls
+
+    importlib.reload(blog.urls)
+    importlib.reload(importlib.import_module(django_settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views_enabled(settings):
+    settings.BLOG_ASYNC_VIEWS = True
+    settings.BLOG_FEED_CACHE_TIMEOUT = 0
+    reload_urlconf()
+    yield
+    settings.BLOG_ASYNC_VIEWS = False
+    reload_urlconf()
+
+
+def get(client, url, **kwargs):
+    return async_to_sync(client.get)(url, **kwargs)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url, view_class", [
+    ("/", async_views.AsyncMainPostsView),
+    ("/category/slug/", async_views.AsyncCategoryPostsView),
+    ("/profile/name/", async_views.AsyncUserProfileView),
+    ("/posts/1/", async_views.AsyncPostDetailView),
+])
+def test_async_views_selected_by_setting(async_views_enabled, url,
+                                         view_class):
+    assert resolve(url).func.view_class is view_class, (
+        "Убедитесь, что при BLOG_ASYNC_VIEWS страницы обслуживают "
+        "асинхронные представления."
+    )
+
+
+@pytest.mark.django_db
+def test_async_feeds(
+        async_views_enabled, async_client, user,
+        many_posts_with_published_locations):
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: post.pub_date,
+        reverse=True,
+    )
+    response = get(async_client, "/")
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context["page_obj"]) == posts[:N_PER_PAGE]
+    assert response.context["paginator"].count == len(posts)
+
+    last = get(async_client, "/", data={"page": "last"})
+    assert list(last.context["page_obj"]) == posts[N_PER_PAGE:]
+    assert get(async_client, "/", data={"page": 100}).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+    category = posts[0].category
+    response = get(async_client, f"/category/{category.slug}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["category"] == category
+
+    profile = get(async_client, f"/profile/{user.username}/")
+    assert profile.status_code == HTTPStatus.OK
+    assert profile.context["profile"] == user
+    assert get(async_client, "/profile/nobody/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_PAGINATION="keyset")
+def test_async_keyset_feed(
+        async_views_enabled, async_client,
+        many_posts_with_published_locations):
+    first = get(async_client, "/")
+    page_obj = first.context["page_obj"]
+    assert page_obj.is_keyset and page_obj.has_next()
+    second = get(async_client, "/", data={"cursor": page_obj.next_cursor})
+    assert second.context["page_obj"].has_previous(), (
+        "Убедитесь, что асинхронная лента поддерживает курсорную пагинацию."
+    )
+
+
+@pytest.mark.django_db
+def test_async_cached_feed(
+        async_views_enabled, settings, async_client,
+        django_assert_max_num_queries, many_posts_with_published_locations):
+    settings.BLOG_FEED_CACHE_TIMEOUT = 60
+    first = get(async_client, "/")
+    with django_assert_max_num_queries(1):
+        cached = get(async_client, "/")
+    assert cached.content == first.content, (
+        "Убедитесь, что асинхронная лента берётся из кеша без запросов "
+        "постов."
+    )
+
+
+@pytest.mark.django_db
+def test_async_post_detail(
+        async_views_enabled, mixer, async_client, user,
+        post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    async_client.force_login(user)
+    url = f"/posts/{post.pk}/"
+    response = get(async_client, url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["post"] == post
+    assert len(response.context["comments"]) == 3
+    assert "form" in response.context
+
+    revalidated = get(
+        async_client, url, headers={"If-None-Match": response["ETag"]}
+    )
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что асинхронная страница поста отвечает 304 на "
+        "условный запрос."
+    )
+    assert get(async_client, "/posts/0/").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
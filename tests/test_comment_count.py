@@ -0,0 +1,67 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        mixer, post_with_published_location, another_post):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что счётчик комментариев поста увеличивается при"
+        " создании комментария."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев поста уменьшается при"
+        " удалении комментария."
+    )
+
+    comments[1].post = another_post
+    comments[1].save()
+    post.refresh_from_db()
+    another_post.refresh_from_db()
+    assert (post.comment_count, another_post.comment_count) == (1, 1), (
+        "Убедитесь, что при переносе комментария в другой пост счётчики"
+        " обоих постов пересчитываются."
+    )
+
+
+@pytest.mark.django_db
+def test_post_edit_keeps_concurrent_comment(
+        mixer, user_client, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend(Comment, post=post)
+    post.title = "Заголовок после комментария"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что сохранение поста, загруженного до нового"
+        " комментария, не перезаписывает счётчик комментариев."
+    )
+    assert post.title == "Заголовок после комментария"
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("recount_comments")
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " счётчики комментариев."
+    )
+
+
+@pytest.fixture
+def another_post(mixer, user, published_category):
+    return mixer.blend(Post, author=user, category=published_category)
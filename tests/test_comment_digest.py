@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.mail import enqueue_comment_digests
+from blog.models import Comment, CommentDigest, OutgoingEmail
+
+
+@pytest.mark.django_db
+def test_digest_replaces_per_comment_emails(
+        another_user_client, post_with_published_location):
+    post = post_with_published_location
+    CommentDigest.objects.create(author=post.author)
+
+    another_user_client.post(
+        f"/posts/{post.pk}/comment/", data={"text": "Комментарий"}
+    )
+
+    assert not OutgoingEmail.objects.exists(), (
+        "Убедитесь, что автору со сводкой не ставится письмо на каждый"
+        " комментарий."
+    )
+
+
+@pytest.mark.django_db
+def test_digest_batch_uses_fixed_number_of_queries(
+        mixer, django_assert_num_queries, published_category):
+    authors = mixer.cycle(3).blend("auth.User")
+    long_ago = timezone.now() - timedelta(days=1)
+    for author in authors:
+        CommentDigest.objects.create(author=author, last_sent_at=long_ago)
+        posts = mixer.cycle(2).blend(
+            "blog.Post", author=author, category=published_category
+        )
+        for post in posts:
+            mixer.cycle(3).blend(Comment, post=post)
+
+    with django_assert_num_queries(6):
+        queued = enqueue_comment_digests()
+
+    assert queued == len(authors)
+    email = OutgoingEmail.objects.get(recipient=authors[0].email)
+    assert email.message.count("/posts/") == 6, (
+        "Убедитесь, что сводка перечисляет все новые комментарии со"
+        " ссылками на посты."
+    )
+    assert enqueue_comment_digests() == 0, (
+        "Убедитесь, что следующая сводка не отправляется раньше окна."
+    )
@@ -0,0 +1,62 @@
+import base64
+from http import HTTPStatus
+
+import pytest
+
+from constants import COMMENTS_PAGE_SIZE
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated_and_loaded_by_fragment(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PAGE_SIZE + 5).blend(
+        "blog.Comment", post=post
+    )
+    expected = sorted(comments, key=lambda c: (c.created_at, c.pk))
+
+    response = unlogged_client.get(f"/posts/{post.pk}/")
+    page = response.context["comments"]
+    assert list(page) == expected[:COMMENTS_PAGE_SIZE], (
+        "Убедитесь, что на странице поста выводится первая порция "
+        "комментариев."
+    )
+    assert page.has_next()
+    fragment_url = f"/posts/{post.pk}/comments/?cursor={page.next_cursor}"
+    assert fragment_url in response.content.decode()
+
+    fragment = unlogged_client.get(fragment_url)
+    assert fragment.status_code == HTTPStatus.OK
+    assert list(fragment.context["comments"]) == (
+        expected[COMMENTS_PAGE_SIZE:]
+    ), "Убедитесь, что фрагмент отдаёт следующую порцию комментариев."
+    content = fragment.content.decode()
+    assert "<form" not in content and "<html" not in content, (
+        "Убедитесь, что фрагмент содержит только список комментариев."
+    )
+
+
+@pytest.mark.django_db
+def test_comments_fragment_respects_visibility(
+        another_user_client, unpublished_posts_with_published_locations):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/posts/{post.pk}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    base64.urlsafe_b64encode(b'["n",["garbage","1"]]').decode(),
+    # Ключ без значений или не строками.
+    base64.urlsafe_b64encode(b'["n",[null,null]]').decode(),
+    base64.urlsafe_b64encode(b'["n",[1,2]]').decode(),
+])
+def test_comments_rejects_broken_cursor(
+        unlogged_client, post_with_published_location, cursor):
+    url = f"/posts/{post_with_published_location.pk}/"
+    for path in (url, f"{url}comments/"):
+        response = unlogged_client.get(path, {"cursor": cursor})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f"Убедитесь, что {path} отвечает 404 на некорректный курсор."
+        )
@@ -0,0 +1,160 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog.models import ContentChange, Post
+
+
+def revalidate(client, url, response):
+    return client.get(url, headers={"If-None-Match": response["ETag"]})
+
+
+def modified_since(client, url, response):
+    return client.get(
+        url, headers={"If-Modified-Since": response["Last-Modified"]}
+    )
+
+
+def settle_changes():
+    """Сдвигает последнее изменение на секунды назад: Last-Modified не
+    отдаётся, пока не прошла секунда изменения.
+    """
+    ContentChange.objects.update(
+        changed_at=timezone.now() - timedelta(seconds=5)
+    )
+
+
+@pytest.mark.django_db
+def test_detail_not_modified(
+        mixer, django_assert_num_queries, unlogged_client, user,
+        post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.pk}/"
+    settle_changes()
+    first = unlogged_client.get(url)
+    assert first.status_code == HTTPStatus.OK
+    assert first["ETag"] and first["Last-Modified"]
+
+    with django_assert_num_queries(1):
+        second = revalidate(unlogged_client, url, first)
+    assert second.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменившаяся страница поста отдаётся с кодом 304."
+    )
+    assert modified_since(unlogged_client, url, first).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    assert revalidate(unlogged_client, url, first).status_code == (
+        HTTPStatus.OK
+    ), "Убедитесь, что новый комментарий меняет ETag страницы поста."
+    assert modified_since(unlogged_client, url, first).status_code == (
+        HTTPStatus.OK
+    ), "Убедитесь, что новый комментарий меняет Last-Modified страницы."
+
+    settle_changes()
+    first = unlogged_client.get(url)
+    comment.delete()
+    assert modified_since(unlogged_client, url, first).status_code == (
+        HTTPStatus.OK
+    ), "Убедитесь, что удаление комментария меняет Last-Modified страницы."
+
+
+@pytest.mark.django_db
+def test_validators_do_not_expire(
+        monkeypatch, unlogged_client, post_with_published_location):
+    settle_changes()
+    first = unlogged_client.get("/")
+    later = time.time() + 60 * 60
+    monkeypatch.setattr("core.mixins.time.time", lambda: later)
+    assert revalidate(unlogged_client, "/", first).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    ), "Убедитесь, что ETag не меняется со временем без изменения данных."
+    assert modified_since(unlogged_client, "/", first).status_code == (
+        HTTPStatus.NOT_MODIFIED
+    )
+    assert first["Last-Modified"] == http_date(
+        ContentChange.objects.get().changed_at.timestamp()
+    ), "Убедитесь, что Last-Modified — время последнего изменения данных."
+
+
+@pytest.mark.django_db
+def test_etag_depends_on_user(
+        user_client, unlogged_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.pk}/"
+    anonymous = unlogged_client.get(url)
+    assert revalidate(user_client, url, anonymous).status_code == (
+        HTTPStatus.OK
+    ), "Убедитесь, что ETag различается для разных пользователей."
+
+
+@pytest.mark.django_db
+def test_feeds_not_modified(
+        user, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        first = unlogged_client.get(url)
+        assert revalidate(unlogged_client, url, first).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        ), f"Убедитесь, что страница {url} поддерживает условный GET."
+
+
+@pytest.mark.django_db
+def test_scheduled_post_changes_feed_etag(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    scheduled = mixer.blend(
+        "blog.Post",
+        category=post.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    first = unlogged_client.get("/")
+    # Наступление даты публикации не сопровождается записью в базу:
+    # пост открывает команда refresh_post_visibility.
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    call_command("refresh_post_visibility", stdout=StringIO())
+    assert revalidate(unlogged_client, "/", first).status_code == (
+        HTTPStatus.OK
+    ), "Убедитесь, что опубликованный отложенный пост меняет ETag ленты."
+
+
+@pytest.mark.django_db
+def test_etag_follows_writes_from_other_processes(
+        mixer, monkeypatch, user, unlogged_client,
+        post_with_published_location):
+    # Запись в другом процессе не меняет поколение кеша лент этого.
+    monkeypatch.setattr("blog.cache.bump_feed_generation", lambda: None)
+    post = post_with_published_location
+    for url in ("/", f"/profile/{user.username}/", f"/posts/{post.pk}/"):
+        first = unlogged_client.get(url)
+        post.title = f"Заголовок для {url}"
+        post.save()
+        assert revalidate(unlogged_client, url, first).status_code == (
+            HTTPStatus.OK
+        ), f"Убедитесь, что изменение поста меняет ETag страницы {url}."
+
+        first = unlogged_client.get(url)
+        mixer.blend("blog.Comment", post=post, author=user)
+        assert revalidate(unlogged_client, url, first).status_code == (
+            HTTPStatus.OK
+        ), f"Убедитесь, что новый комментарий меняет ETag страницы {url}."
+
+        first = unlogged_client.get(url)
+        post.category.title = f"Категория для {url}"
+        post.category.save()
+        assert revalidate(unlogged_client, url, first).status_code == (
+            HTTPStatus.OK
+        ), f"Убедитесь, что переименование категории меняет ETag {url}."
@@ -0,0 +1,30 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_detail_page_uses_two_queries(
+        mixer, django_assert_num_queries, unlogged_client,
+        post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post)
+
+    with django_assert_num_queries(2):
+        response = unlogged_client.get(f"/posts/{post.pk}/")
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context["comments"]) == 5
+
+
+@pytest.mark.django_db
+def test_detail_visibility_in_single_query(
+        user_client, another_user_client,
+        unpublished_posts_with_published_locations):
+    post = unpublished_posts_with_published_locations[0]
+    url = f"/posts/{post.pk}/"
+
+    assert user_client.get(url).status_code == HTTPStatus.OK, (
+        "Убедитесь, что автор видит свой неопубликованный пост."
+    )
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND
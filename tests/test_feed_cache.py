@@ -0,0 +1,98 @@
+import pytest
+from django.test import override_settings
+
+from blog.models import Post
+
+
+def get_content(client, url):
+    return client.get(url).content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_feed_page_is_cached_until_data_changes(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    assert post.title in get_content(user_client, "/")
+
+    Post.objects.filter(pk=post.pk).update(title="Заголовок в обход кеша")
+    assert "Заголовок в обход кеша" not in get_content(user_client, "/"), (
+        "Убедитесь, что повторный запрос ленты отдаётся из кеша."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in get_content(user_client, "/"), (
+        "Убедитесь, что изменение поста сбрасывает кеш лент."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_cache_follows_writes_from_other_processes(
+        monkeypatch, user_client, post_with_published_location):
+    # Запись в другом процессе не меняет поколение кеша лент этого.
+    monkeypatch.setattr("blog.cache.bump_feed_generation", lambda: None)
+    post = post_with_published_location
+    assert post.title in get_content(user_client, "/")
+    post.title = "Заголовок из другого процесса"
+    post.save()
+    assert "Заголовок из другого процесса" in get_content(user_client, "/"), (
+        "Убедитесь, что ключ кеша лент меняется вместе с отметкой изменения"
+        " данных в базе."
+    )
+
+
+@pytest.mark.django_db
+def test_profile_cache_separates_author_and_readers(
+        user, user_client, another_user_client,
+        unpublished_posts_with_published_locations):
+    url = f"/profile/{user.username}/"
+    title = unpublished_posts_with_published_locations[0].title
+
+    assert title not in get_content(another_user_client, url)
+    assert title in get_content(user_client, url), (
+        "Убедитесь, что автор видит свои неопубликованные посты, даже если"
+        " лента профиля уже закеширована для других пользователей."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_cache_works_with_file_backend(
+        tmp_path, user_client, post_with_published_location):
+    caches = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": tmp_path,
+        },
+    }
+    post = post_with_published_location
+    with override_settings(CACHES=caches):
+        assert post.title in get_content(user_client, "/")
+        assert any(tmp_path.iterdir())
+        post.title = "Новый заголовок"
+        post.save()
+        assert "Новый заголовок" in get_content(user_client, "/")
+
+
+@pytest.mark.django_db
+def test_feed_cache_ignores_unrelated_query_params(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    get_content(user_client, "/")
+    Post.objects.filter(pk=post.pk).update(title="Заголовок в обход кеша")
+    assert "Заголовок в обход кеша" not in get_content(
+        user_client, "/?utm_source=mail"
+    ), (
+        "Убедитесь, что посторонние параметры запроса не создают новые "
+        "записи в кеше лент."
+    )
+
+
+@pytest.mark.django_db
+def test_author_rename_resets_feed_cache(
+        user, user_client, post_with_published_location):
+    get_content(user_client, "/")
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in get_content(user_client, "/"), (
+        "Убедитесь, что смена имени автора сбрасывает кеш лент."
+    )
@@ -0,0 +1,65 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post, User
+
+
+def snapshot():
+    return list(Post.objects.order_by("pk").values_list(
+        "title", "text", "author__username", "category__slug"
+    ))
+
+
+@pytest.mark.django_db
+def test_generate_is_deterministic():
+    options = {"users": 5, "posts": 20, "comments": 40, "seed": 7}
+    call_command("generate_blog_data", stdout=io.StringIO(), **options)
+    first = snapshot()
+    for model in (Post, Category, User):
+        model.objects.all().delete()
+
+    call_command("generate_blog_data", stdout=io.StringIO(), **options)
+    assert snapshot() == first, (
+        "Убедитесь, что при одном зерне генерируются одни и те же данные."
+    )
+
+
+@pytest.mark.django_db
+def test_generated_blog_is_skewed_and_consistent(generated_blog):
+    assert generated_blog["blog.post"] == Post.objects.count() == 60
+    assert Comment.objects.count() == 300
+
+    now = timezone.now()
+    past = Post.objects.filter(pub_date__lte=now)
+    oldest = past.order_by("pub_date").first().pub_date
+    middle = oldest + (now - oldest) / 2
+    assert past.filter(pub_date__gte=middle).count() > past.filter(
+        pub_date__lt=middle
+    ).count(), "Убедитесь, что свежих постов больше, чем старых."
+
+    top_author = Post.objects.values("author").annotate(
+        posts=Count("pk")
+    ).aggregate(top=Max("posts"))["top"]
+    assert top_author > 60 / 10, (
+        "Убедитесь, что посты распределены между авторами неравномерно."
+    )
+    assert all(
+        post.comment_count == post.comments.count()
+        for post in Post.objects.all()
+    )
+    visible = Post.objects.filter(
+        pub_date__lte=now, is_published=True, category__is_published=True
+    )
+    assert set(Post.objects.filter(is_visible=True)) == set(visible), (
+        "Убедитесь, что у сгенерированных постов заполнен флаг is_visible."
+    )
+
+
+@pytest.mark.django_db
+def test_generated_users_can_log_in(client, generated_blog):
+    user = User.objects.first()
+    assert client.login(username=user.username, password="password")
@@ -0,0 +1,96 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.importer import iter_json_array
+from blog.models import Comment, Post
+
+DUMP_PATH = Path(__file__).resolve().parent.parent / "db.json"
+
+
+def test_iter_json_array_reads_in_small_chunks():
+    items = [{"n": number, "text": "ё" * number} for number in range(50)]
+    stream = io.StringIO(json.dumps(items, indent=2))
+    assert list(iter_json_array(stream, chunk_size=7)) == items
+
+
+def test_iter_json_array_rejects_truncated_dump():
+    stream = io.StringIO('[{"n": 1}, {"n": ')
+    with pytest.raises(ValueError):
+        list(iter_json_array(stream, chunk_size=4))
+
+
+def test_iter_json_array_stops_on_malformed_item():
+    stream = io.StringIO('[{"n": 1}, {"n": oops}, ' + '{"n": 2}, ' * 10000)
+    with pytest.raises(ValueError, match="длиннее 100 символов"):
+        list(iter_json_array(stream, chunk_size=10, max_item_size=100))
+    assert stream.tell() < 200, (
+        "Убедитесь, что повреждённый элемент не заставляет читать в память "
+        "остаток выгрузки."
+    )
+
+
+@pytest.mark.django_db
+def test_import_repository_dump():
+    dump = json.loads(DUMP_PATH.read_text(encoding="utf-8"))
+    posts = {item["pk"]: item for item in dump if item["model"] == "blog.post"}
+
+    call_command(
+        "import_blog_data", str(DUMP_PATH), batch_size=7, read_size=512,
+        stdout=io.StringIO(),
+    )
+
+    assert Post.objects.count() == len(posts)
+    post = Post.objects.get(pk=1)
+    assert post.created_at.isoformat().startswith(
+        posts[1]["fields"]["created_at"][:19]
+    ), "Убедитесь, что импорт сохраняет даты создания из выгрузки."
+    assert post.author_id == posts[1]["fields"]["author"]
+
+
+@pytest.mark.django_db
+def test_import_resolves_natural_keys_and_counts_comments(tmp_path):
+    dump = [
+        {"model": "auth.user", "pk": 5, "fields": {
+            "username": "reader", "password": "!",
+        }},
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Первый", "post": 10, "author": ["reader"],
+            "created_at": "2024-01-01T00:00:00Z", "is_published": True,
+        }},
+        {"model": "blog.post", "pk": 10, "fields": {
+            "title": "Пост", "text": "Текст", "author": ["reader"],
+            "pub_date": "2024-01-01T00:00:00Z",
+            "created_at": "2024-01-01T00:00:00Z", "is_published": True,
+        }},
+        {"model": "sessions.session", "pk": "x", "fields": {}},
+    ]
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(dump), encoding="utf-8")
+
+    call_command("import_blog_data", str(path), stdout=io.StringIO())
+
+    post = Post.objects.get(pk=10)
+    assert post.author.username == "reader"
+    assert post.comment_count == 1, (
+        "Убедитесь, что после импорта пересчитываются счётчики комментариев."
+    )
+    assert Comment.objects.get(pk=1).post_id == 10
+
+
+@pytest.mark.django_db
+def test_import_rolls_back_on_broken_foreign_key(tmp_path):
+    dump = [{"model": "blog.post", "pk": 1, "fields": {
+        "title": "Пост", "text": "Текст", "author": 999,
+        "pub_date": "2024-01-01T00:00:00Z",
+        "created_at": "2024-01-01T00:00:00Z", "is_published": True,
+    }}]
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(dump), encoding="utf-8")
+
+    with pytest.raises(CommandError):
+        call_command("import_blog_data", str(path), stdout=io.StringIO())
+    assert not Post.objects.exists()
@@ -0,0 +1,42 @@
+import re
+
+import pytest
+from django.db import connection
+
+from blog.models import Comment, Post
+
+
+def assert_uses_index(queryset, table):
+    plan = queryset.explain()
+    full_scans = re.findall(rf"SCAN {table}\b(?! USING)", plan)
+    assert not full_scans, (
+        f"Убедитесь, что запрос к таблице `{table}` использует индекс,"
+        f" а не полный просмотр таблицы:\n{plan}"
+    )
+    assert "TEMP B-TREE FOR ORDER BY" not in plan, (
+        f"Убедитесь, что сортировка запроса к таблице `{table}`"
+        f" обеспечивается индексом:\n{plan}"
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "sqlite",
+    reason="Разбор плана запроса написан для SQLite.",
+)
+def test_feed_queries_use_indexes(
+        user, published_category, post_with_published_location):
+    feeds = {
+        "index": Post.objects.post_published_query(),
+        "category": Post.objects.post_published_query().filter(
+            category=published_category
+        ),
+        "profile": Post.objects.post_published_query().filter(author=user),
+        "author profile": Post.objects.post_all_query().filter(author=user),
+        "comments": Comment.objects.filter(
+            post=post_with_published_location
+        ).select_related("author"),
+    }
+    for queryset in feeds.values():
+        table = queryset.model._meta.db_table
+        assert_uses_index(queryset, table)
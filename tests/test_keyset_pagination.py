@@ -0,0 +1,52 @@
+import base64
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_PAGINATION="keyset")
+def test_keyset_pagination_walks_feed(
+        user_client, many_posts_with_published_locations):
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    )
+
+    first = user_client.get("/")
+    page_obj = first.context["page_obj"]
+    assert list(page_obj) == expected[:N_PER_PAGE], (
+        "Убедитесь, что курсорная пагинация отдаёт первую страницу ленты."
+    )
+    assert page_obj.has_next() and not page_obj.has_previous()
+
+    second = user_client.get("/", {"cursor": page_obj.next_cursor})
+    page_obj = second.context["page_obj"]
+    assert list(page_obj) == expected[N_PER_PAGE:2 * N_PER_PAGE], (
+        "Убедитесь, что курсор следующей страницы продолжает ленту."
+    )
+    assert page_obj.has_previous() and not page_obj.has_next()
+
+    back = user_client.get("/", {"cursor": page_obj.previous_cursor})
+    assert list(back.context["page_obj"]) == expected[:N_PER_PAGE], (
+        "Убедитесь, что курсор предыдущей страницы возвращает назад."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_PAGINATION="keyset")
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    # Корректный base64 и JSON, но ключ не приводится к дате.
+    base64.urlsafe_b64encode(b'["n",["garbage","1"]]').decode(),
+    # Ключ без значений или не строками.
+    base64.urlsafe_b64encode(b'["n",[null,null]]').decode(),
+    base64.urlsafe_b64encode(b'["n",[1,2]]').decode(),
+])
+def test_keyset_pagination_rejects_broken_cursor(user_client, cursor):
+    response = user_client.get("/", {"cursor": cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,109 @@
+import smtplib
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import OutgoingEmail
+
+LOCMEM_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP недоступен")
+
+
+class DroppingBackend(EmailBackend):
+    """Соединение обрывается на первом письме и живёт до open()."""
+
+    opened = 0
+    dropped = False
+
+    def open(self):
+        type(self).opened += 1
+        self.alive = True
+
+    def close(self):
+        self.alive = False
+
+    def send_messages(self, email_messages):
+        if not DroppingBackend.dropped:
+            DroppingBackend.dropped = True
+            self.alive = False
+        if not self.alive:
+            raise smtplib.SMTPServerDisconnected("Соединение закрыто")
+        return super().send_messages(email_messages)
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_BACKEND=LOCMEM_BACKEND)
+def test_comment_enqueues_notification(
+        another_user_client, post_with_published_location):
+    post = post_with_published_location
+    another_user_client.post(
+        f"/posts/{post.pk}/comment/", data={"text": "Комментарий"}
+    )
+
+    assert not mail.outbox, (
+        "Убедитесь, что письмо автору не отправляется во время запроса."
+    )
+    email = OutgoingEmail.objects.get()
+    assert email.recipient == post.author.email
+
+    call_command("send_queued_mail")
+
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [post.author.email]
+    email.refresh_from_db()
+    assert email.sent_at is not None, (
+        "Убедитесь, что отправленное письмо помечается в очереди."
+    )
+
+
+@pytest.mark.django_db
+@override_settings(
+    EMAIL_BACKEND="test_mail_queue.FailingBackend",
+    BLOG_MAIL_RETRY_DELAY=60,
+)
+def test_failed_email_is_retried_later():
+    email = OutgoingEmail.objects.enqueue(
+        subject="Тема", message="Текст", recipient="author@example.com"
+    )
+
+    call_command("send_queued_mail")
+
+    email.refresh_from_db()
+    assert email.sent_at is None
+    assert email.attempts == 1
+    assert "SMTP недоступен" in email.last_error
+    assert email.next_attempt_at > timezone.now(), (
+        "Убедитесь, что повторная отправка откладывается."
+    )
+    assert not OutgoingEmail.objects.ready().exists()
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_BACKEND="test_mail_queue.DroppingBackend")
+def test_dropped_connection_is_reopened(monkeypatch):
+    monkeypatch.setattr(DroppingBackend, "opened", 0)
+    monkeypatch.setattr(DroppingBackend, "dropped", False)
+    for number in range(3):
+        OutgoingEmail.objects.enqueue(
+            subject=f"Тема {number}",
+            message="Текст",
+            recipient="author@example.com",
+        )
+
+    call_command("send_queued_mail")
+
+    assert len(mail.outbox) == 2, (
+        "Убедитесь, что после обрыва соединения с SMTP-сервером оно"
+        " открывается заново и остальные письма отправляются."
+    )
+    assert DroppingBackend.opened == 2
+    assert OutgoingEmail.objects.filter(sent_at__isnull=True).count() == 1
@@ -0,0 +1,60 @@
+import pytest
+from django.core.cache import caches
+
+from blog.cache import POST_CARD_KEY_PREFIX, post_card_key
+from blog.models import Post
+
+
+@pytest.fixture
+def card_cache(settings, monkeypatch):
+    """Кеш с учётом обращений к карточкам; кеш лент отключён."""
+    settings.BLOG_FEED_CACHE_TIMEOUT = 0
+    cache = caches[settings.BLOG_FEED_CACHE_ALIAS]
+    cache.calls = []
+    for name in ("get_many", "set_many"):
+        method = getattr(cache, name)
+
+        def spy(data, *args, name=name, method=method, **kwargs):
+            if all(key.startswith(POST_CARD_KEY_PREFIX) for key in data):
+                cache.calls.append((name, len(data)))
+            return method(data, *args, **kwargs)
+
+        monkeypatch.setattr(cache, name, spy)
+    return cache
+
+
+@pytest.mark.django_db
+def test_cards_are_fetched_with_one_round_trip(
+        card_cache, client, user, many_posts_with_published_locations):
+    client.get("/")
+    assert card_cache.calls == [("get_many", 10), ("set_many", 10)]
+
+    card_cache.calls.clear()
+    client.get(f"/profile/{user.username}/")
+    assert card_cache.calls == [("get_many", 10)], (
+        "Убедитесь, что карточки постов одной страницы читаются из кеша "
+        "одним запросом и переиспользуются разными лентами."
+    )
+
+
+@pytest.mark.django_db
+def test_card_key_follows_rendered_data(
+        card_cache, client, post_with_published_location):
+    post = Post.objects.post_all_query().get(
+        pk=post_with_published_location.pk
+    )
+    key = post_card_key(post)
+    client.get("/")
+    assert key in card_cache.get_many([key])
+
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+    post.category.title = "Новое название категории"
+    post.category.save()
+    post = Post.objects.post_all_query().get(pk=post.pk)
+    assert post_card_key(post) != key
+    content = client.get("/").content.decode("utf-8")
+    assert "Комментарии (7)" in content
+    assert "Новое название категории" in content, (
+        "Убедитесь, что карточка перерисовывается при изменении выводимых "
+        "в ней данных."
+    )
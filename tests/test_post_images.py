@@ -0,0 +1,92 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from blog.images import WEBP, rendition_name
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_renditions_created_on_upload(post_with_published_location):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.image_dimensions == (100, 100), (
+        "Убедитесь, что при загрузке изображения сохраняются его размеры."
+    )
+    for extension in ("jpg", WEBP):
+        assert default_storage.exists(
+            rendition_name(post.image.name, 100, extension)
+        )
+
+
+@pytest.mark.django_db
+def test_feed_card_uses_rendition(user_client, post_with_published_location):
+    content = user_client.get("/").content.decode("utf-8")
+    img = BeautifulSoup(content, features="html.parser").find(
+        "img", srcset=True
+    )
+    post = post_with_published_location
+    assert img["src"] != post.image.url, (
+        "Убедитесь, что в карточке поста выводится уменьшенная копия."
+    )
+    assert (img["width"], img["height"]) == ("100", "100")
+    source = img.find_previous_sibling("source")
+    assert source["type"] == "image/webp"
+
+
+@pytest.mark.django_db
+def test_backfill_command_saves_sizes(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(image_size="")
+
+    call_command("generate_image_renditions", workers=1, missing_only=True)
+
+    post.refresh_from_db()
+    assert post.image_dimensions == (100, 100)
+
+
+def test_rendition_names_keep_original_extension():
+    assert rendition_name("images/photo.jpg", 640, WEBP) != rendition_name(
+        "images/photo.png", 640, WEBP
+    ), "Убедитесь, что копии photo.jpg и photo.png не совпадают по имени."
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("image_size", ["", "100x100"])
+def test_missing_original_does_not_break_feed(
+        user_client, post_with_published_location, image_size):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        image="images/missing.jpg", image_size=image_size
+    )
+    response = user_client.get("/")
+    assert response.status_code == 200, (
+        "Убедитесь, что отсутствующий файл изображения не ломает ленту."
+    )
+    if not image_size:
+        img = BeautifulSoup(
+            response.content.decode("utf-8"), features="html.parser"
+        ).find("img", src="/media/images/missing.jpg")
+        assert img is not None, (
+            "Убедитесь, что без готовых копий выводится оригинал."
+        )
+
+
+@pytest.mark.django_db
+def test_replaced_image_renditions_are_deleted(
+        django_capture_on_commit_callbacks, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    old_name = post.image.name
+    old_renditions = [
+        rendition_name(old_name, 100, extension)
+        for extension in ("jpg", WEBP)
+    ]
+    assert all(map(default_storage.exists, old_renditions))
+
+    post.image = ""
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert not any(map(default_storage.exists, old_renditions)), (
+        "Убедитесь, что копии заменённого изображения удаляются."
+    )
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+
+def visible_pks():
+    return set(Post.objects.filter(is_visible=True).values_list(
+        "pk", flat=True
+    ))
+
+
+@pytest.mark.django_db
+def test_post_save_updates_visibility(post_with_published_location):
+    post = post_with_published_location
+    assert post.is_visible
+    post.is_published = False
+    post.save()
+    assert visible_pks() == set(), (
+        "Убедитесь, что снятие поста с публикации сбрасывает is_visible."
+    )
+    post.is_published = True
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert visible_pks() == set(), (
+        "Убедитесь, что отложенный пост не виден всем."
+    )
+
+
+@pytest.mark.django_db
+def test_category_publication_propagates(
+        mixer, published_category, published_location):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert visible_pks() == {post.pk for post in posts}
+
+    published_category.is_published = False
+    published_category.save()
+    assert visible_pks() == set(), (
+        "Убедитесь, что снятие категории с публикации скрывает её посты."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert visible_pks() == {post.pk for post in posts}
+
+    published_category.delete()
+    assert visible_pks() == set(), (
+        "Убедитесь, что посты удалённой категории скрываются."
+    )
+
+
+@pytest.mark.django_db
+def test_category_admin_actions(
+        admin_client, django_assert_max_num_queries,
+        many_posts_with_published_locations):
+    category = many_posts_with_published_locations[0].category
+    before = visible_pks()
+    data = {
+        "action": "unpublish",
+        "_selected_action": [category.pk],
+    }
+    with django_assert_max_num_queries(12):
+        admin_client.post("/admin/blog/category/", data)
+    assert not Category.objects.get(pk=category.pk).is_published
+    assert not Post.objects.filter(category=category, is_visible=True), (
+        "Убедитесь, что действие админки снимает с публикации посты "
+        "категории одним массовым обновлением."
+    )
+
+    admin_client.post("/admin/blog/category/", {**data, "action": "publish"})
+    assert visible_pks() == before
+
+
+@pytest.mark.django_db
+def test_refresh_command_opens_scheduled_posts(
+        mixer, published_category, post_with_published_location):
+    scheduled = mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    assert scheduled.pk not in visible_pks()
+    call_command("refresh_post_visibility", stdout=StringIO())
+    assert scheduled.pk in visible_pks(), (
+        "Убедитесь, что команда refresh_post_visibility открывает посты, "
+        "время публикации которых наступило."
+    )
+
+    Post.objects.update(is_visible=True, is_published=False)
+    call_command("refresh_post_visibility", "--all", stdout=StringIO())
+    assert visible_pks() == set()
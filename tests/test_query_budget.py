@@ -0,0 +1,102 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.views import MainPostsListView
+from core.middleware import (
+    QueryBudgetExceeded,
+    QueryInstrumentationMiddleware,
+    query_stats,
+)
+
+
+@pytest.mark.django_db
+@override_settings(QUERY_BUDGET_STRICT=True)
+def test_read_views_fit_query_budget(
+        user, user_client, unlogged_client, post_with_published_location,
+        comment_to_a_post):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.pk}/",
+        f"/posts/{post.pk}/edit/",
+        "/posts/create/",
+        "/edit_profile/",
+    )
+    for client in (unlogged_client, user_client):
+        for url in urls:
+            response = client.get(url)
+            assert int(response["X-Query-Count"]) >= 0
+            assert "sql;dur=" in response["Server-Timing"]
+
+
+@pytest.mark.django_db
+@override_settings(QUERY_BUDGET_STRICT=True)
+def test_exceeding_query_budget_fails(
+        monkeypatch, user_client, post_with_published_location):
+    monkeypatch.setattr(MainPostsListView, "query_budget", 0)
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.get("/")
+
+
+@pytest.mark.django_db
+def test_query_stats_endpoint(admin_client, user_client):
+    query_stats.reset()
+    user_client.get("/")
+
+    stats = admin_client.get("/debug/query-stats/").json()
+
+    assert stats["blog:index"]["requests"] == 1
+    assert "avg_sql_ms" in stats["blog:index"]
+    assert user_client.get("/debug/query-stats/").status_code == 302, (
+        "Убедитесь, что статистика запросов доступна только персоналу."
+    )
+
+
+@pytest.mark.django_db
+def test_edit_views_fetch_object_once(
+        user, user_client, post_with_published_location, comment_to_a_post):
+    post = post_with_published_location
+    comment = comment_to_a_post
+    comment.author = user
+    comment.save()
+    pages = (
+        (f"/posts/{post.pk}/edit/", "blog_post"),
+        (f"/posts/{post.pk}/delete/", "blog_post"),
+        (f"/posts/{post.pk}/edit_comment/{comment.pk}/", "blog_comment"),
+        (f"/posts/{post.pk}/delete_comment/{comment.pk}/", "blog_comment"),
+    )
+    for url, table in pages:
+        with CaptureQueriesContext(connection) as queries:
+            user_client.get(url)
+        fetches = [
+            query for query in queries
+            if f'FROM "{table}"' in query["sql"]
+        ]
+        assert len(fetches) == 1, (
+            f"Убедитесь, что страница {url} загружает объект одним"
+            " запросом вместе с проверкой автора."
+        )
+
+
+@pytest.mark.django_db
+def test_instrumentation_keeps_async_chain_async(
+        post_with_published_location):
+    async def view(request):
+        return HttpResponse(str(await Post.objects.acount()))
+
+    middleware = QueryInstrumentationMiddleware(view)
+    assert iscoroutinefunction(middleware), (
+        "Убедитесь, что middleware инструментирования работает в"
+        " асинхронной цепочке без перевода её в поток."
+    )
+    response = async_to_sync(middleware)(RequestFactory().get("/"))
+    assert response.content == b"1"
+    assert response["X-Query-Count"] == "1"
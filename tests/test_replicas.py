@@ -0,0 +1,123 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.cache import get_feed_generation
+from blog.models import Comment, Post
+from core.routers import ReplicaRouter, use_primary, use_replicas
+
+REPLICA = "replica_test"
+
+
+@pytest.fixture
+def replica(settings, tmp_path, post_with_published_location):
+    """Реплика с постом в отдельном файле SQLite, как при локальном
+    запуске.
+    """
+    config = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": f"file:{tmp_path / 'replica.sqlite3'}?mode=ro",
+        "OPTIONS": {"uri": True},
+    }
+    settings.DATABASES = {**django_settings.DATABASES, REPLICA: config}
+    settings.BLOG_DB_REPLICAS = [REPLICA]
+    connections.settings[REPLICA] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+        REPLICA: config,
+    })[REPLICA]
+    call_command("sync_replicas", stdout=StringIO())
+    # Тесты pytest-django не пускают в базы, которых не было при запуске,
+    # но уже открытое соединение не проверяют.
+    connections[REPLICA].connect()
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+def test_router(settings):
+    settings.BLOG_DB_REPLICAS = [REPLICA]
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS, (
+        "Убедитесь, что вне запроса чтения идут в основную базу."
+    )
+    with use_replicas():
+        assert router.db_for_read(Post) == REPLICA, (
+            "Убедитесь, что внутри use_replicas() посты читаются с реплики."
+        )
+        assert router.db_for_read(get_user_model()) == DEFAULT_DB_ALIAS, (
+            "Убедитесь, что пользователи всегда читаются из основной базы."
+        )
+        assert router.db_for_write(Post) == DEFAULT_DB_ALIAS
+        with use_primary():
+            assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
+    assert not router.allow_migrate(REPLICA, "blog"), (
+        "Убедитесь, что миграции не применяются к репликам."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_replicas(replica, post_with_published_location):
+    assert Post.objects.using(replica).filter(
+        pk=post_with_published_location.pk
+    ).exists(), "Убедитесь, что sync_replicas копирует основную базу."
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_resets_only_shared_feed_cache(settings, tmp_path, replica):
+    generation = get_feed_generation()
+    call_command("sync_replicas", stdout=StringIO())
+    assert get_feed_generation() == generation, (
+        "Убедитесь, что sync_replicas не меняет поколение в кеше "
+        "собственного процесса: веб-серверы его не увидят."
+    )
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": tmp_path / "cache",
+    }}
+    generation = get_feed_generation()
+    call_command("sync_replicas", stdout=StringIO())
+    assert get_feed_generation() == generation + 1, (
+        "Убедитесь, что при общем кеше sync_replicas сбрасывает кеш лент."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_go_to_replica(
+        replica, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    post.title = "Новый заголовок"
+    post.save()
+    response = unlogged_client.get(f"/posts/{post.pk}/")
+    assert response.status_code == HTTPStatus.OK
+    assert "Новый заголовок" not in response.content.decode(), (
+        "Убедитесь, что страница поста читается с реплики."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_author_sees_own_comment(
+        replica, user_client, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.pk}/"
+    response = user_client.post(
+        f"/posts/{post.pk}/comment/", data={"text": "Свежий комментарий"}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert django_settings.BLOG_DB_PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после изменяющего запроса ставится cookie, "
+        "закрепляющая чтения за основной базой."
+    )
+    assert Comment.objects.filter(post=post).exists()
+    assert "Свежий комментарий" in user_client.get(url).content.decode(), (
+        "Убедитесь, что автор сразу видит свой комментарий после "
+        "перенаправления."
+    )
+    assert "Свежий комментарий" not in (
+        unlogged_client.get(url).content.decode()
+    ), "Убедитесь, что остальные клиенты читают с реплики."
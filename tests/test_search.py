@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from blog.search import get_backend
+
+BACKENDS = ("fts5", "index")
+
+
+@pytest.fixture(params=BACKENDS)
+def search_backend(request):
+    if request.param == "fts5" and get_backend() != "fts5":
+        pytest.skip("SQLite собран без FTS5.")
+    with override_settings(BLOG_SEARCH_BACKEND=request.param):
+        yield request.param
+
+
+@pytest.fixture
+def search_posts(mixer, published_category, published_location):
+    def make(**kwargs):
+        fields = {
+            "category": published_category,
+            "location": published_location,
+            "is_published": True,
+            **kwargs,
+        }
+        return mixer.blend("blog.Post", **fields)
+    return make
+
+
+@pytest.mark.django_db
+def test_search_stems_and_ranks(client, search_backend, search_posts):
+    in_text = search_posts(
+        title="Прогулка", text="Вечером мы смотрели на горные озёра."
+    )
+    in_title = search_posts(title="Горное озеро", text="Пейзажи.")
+    search_posts(title="Горы", text="Ничего про воду.")
+
+    response = client.get("/search/", {"q": "горное озеро"})
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context["page_obj"]) == [in_title, in_text], (
+        "Убедитесь, что поиск находит словоформы всех слов запроса и "
+        "ставит совпадения в заголовке выше совпадений в тексте."
+    )
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(
+        mixer, client, search_backend, search_posts):
+    unpublished_category = mixer.blend("blog.Category", is_published=False)
+    search_posts(title="Скрытый пост", is_published=False)
+    search_posts(title="Скрытая категория", category=unpublished_category)
+    visible = search_posts(title="Открытый пост")
+
+    response = client.get("/search/", {"q": "пост категория"})
+    assert list(response.context["page_obj"]) == []
+    response = client.get("/search/", {"q": "пост"})
+    assert list(response.context["page_obj"]) == [visible], (
+        "Убедитесь, что поиск не показывает неопубликованные посты."
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_edits(client, search_backend, search_posts):
+    post = search_posts(title="Черновик", text="Старый текст.")
+    post.title = "Финальная версия"
+    post.save()
+
+    assert not client.get("/search/", {"q": "черновик"}).context[
+        "page_obj"
+    ].object_list.exists()
+    response = client.get("/search/", {"q": "финальный"})
+    assert list(response.context["page_obj"]) == [post]
+
+    post.delete()
+    response = client.get("/search/", {"q": "финальный"})
+    assert list(response.context["page_obj"]) == []
+
+
+@pytest.mark.django_db
+def test_search_paginates_with_query(client, search_backend, search_posts):
+    for _ in range(15):
+        search_posts(title="Заметка")
+
+    response = client.get("/search/", {"q": "заметка"})
+    assert len(response.context["page_obj"]) == 10
+    assert "?q=%D0%B7%D0%B0%D0%BC%D0%B5%D1%82%D0%BA%D0%B0&amp;page=2" in (
+        response.content.decode()
+    ), "Убедитесь, что ссылки пагинации сохраняют поисковый запрос."
+    response = client.get("/search/", {"q": "заметка", "page": 2})
+    assert len(response.context["page_obj"]) == 5
@@ -0,0 +1,70 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post, SearchIndexCheckpoint
+from blog.search import get_backend, search_posts
+
+
+def found(query):
+    return set(search_posts(Post.objects.all(), query))
+
+
+@pytest.fixture
+def imported_posts(mixer, user, published_category):
+    # bulk_create не вызывает сигналы, посты не попадают в индекс.
+    return Post.objects.bulk_create(
+        Post(
+            title=f"Импортированная заметка {number}",
+            text="Текст о путешествиях.",
+            author=user,
+            category=published_category,
+            pub_date=timezone.now(),
+        )
+        for number in range(7)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("workers", (0, 2))
+def test_rebuild_indexes_existing_posts(imported_posts, workers):
+    assert not found("путешествие")
+    call_command(
+        "rebuild_search_index", full=True, workers=workers, batch_size=3
+    )
+    assert found("путешествие") == set(Post.objects.all()), (
+        "Убедитесь, что команда индексирует все существующие посты."
+    )
+    checkpoint = SearchIndexCheckpoint.objects.get(backend=get_backend())
+    assert checkpoint.indexed_until is not None
+    assert checkpoint.last_pk == max(post.pk for post in imported_posts)
+
+
+@pytest.mark.django_db
+def test_rebuild_resumes_from_checkpoint(imported_posts):
+    call_command("rebuild_search_index", full=True, workers=0)
+    middle = imported_posts[3].pk
+    SearchIndexCheckpoint.objects.filter(backend=get_backend()).update(
+        last_pk=middle, indexed_until=None
+    )
+    Post.objects.update(text="Текст о горах.")
+
+    call_command("rebuild_search_index", workers=0)
+    assert found("горы") == {
+        post for post in Post.objects.all() if post.pk > middle
+    }, "Убедитесь, что прерванное построение продолжается с контрольной точки."
+
+
+@pytest.mark.django_db
+def test_rebuild_catches_up_changed_posts(imported_posts):
+    call_command("rebuild_search_index", full=True, workers=0)
+    changed = imported_posts[0]
+    Post.objects.filter(pk=changed.pk).update(
+        text="Текст о море.", updated_at=timezone.now()
+    )
+    assert not found("море")
+
+    call_command("rebuild_search_index", workers=0)
+    assert found("море") == {changed}, (
+        "Убедитесь, что повторный запуск переиндексирует изменённые посты."
+    )
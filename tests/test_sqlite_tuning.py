@@ -0,0 +1,42 @@
+import pytest
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from blogicum import settings_production
+
+
+@pytest.fixture
+def tuned_connection(tmp_path, django_db_blocker):
+    config = {
+        **settings_production.DATABASES["default"],
+        "NAME": str(tmp_path / "tuned.sqlite3"),
+    }
+    settings_dict = connections.configure_settings({"default": config})
+    connection = DatabaseWrapper(settings_dict["default"], alias="tuned")
+    with django_db_blocker.unblock():
+        yield connection
+        connection.close()
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_production_sqlite_profile(tuned_connection):
+    assert pragma(tuned_connection, "journal_mode") == "wal", (
+        "Убедитесь, что боевой профиль включает журнал WAL."
+    )
+    # 1 — NORMAL.
+    assert pragma(tuned_connection, "synchronous") == 1
+    assert pragma(tuned_connection, "cache_size") < 0
+    assert pragma(tuned_connection, "mmap_size") > 0
+    assert pragma(tuned_connection, "busy_timeout") >= 1000, (
+        "Убедитесь, что соединение ждёт освобождения блокировки записи."
+    )
+    assert tuned_connection.transaction_mode == "IMMEDIATE"
+    assert settings_production.DATABASES["default"]["CONN_MAX_AGE"], (
+        "Убедитесь, что боевой профиль переиспользует соединения."
+    )
+    assert settings_production.DATABASES["default"]["CONN_HEALTH_CHECKS"]
@@ -0,0 +1,77 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment, Post
+from core import writes
+from core.writes import WriteCoordinator
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = WriteCoordinator(batch_size=10)
+    yield coordinator
+    coordinator.close()
+
+
+def add_comment(post, author, text):
+    if text == "ошибка":
+        raise ValueError(text)
+    return Comment.objects.create(post=post, author=author, text=text)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_group_commit(coordinator, user, post_with_published_location):
+    post = post_with_published_location
+    started, release = threading.Event(), threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait(5)
+
+    first = coordinator.submit(blocker)
+    started.wait(5)
+    texts = ["один", "два", "ошибка", "три"]
+    futures = [
+        coordinator.submit(add_comment, post, user, text) for text in texts
+    ]
+    release.set()
+    first.result(5)
+
+    with pytest.raises(ValueError):
+        futures[2].result(5)
+    created = [futures[i].result(5) for i in (0, 1, 3)]
+    assert [comment.text for comment in created] == ["один", "два", "три"]
+    assert coordinator.stats["batches"] == 2, (
+        "Убедитесь, что записи, накопившиеся за фиксацию, фиксируются "
+        "одной пачкой."
+    )
+    assert Comment.objects.filter(post=post).count() == 3, (
+        "Убедитесь, что ошибка одной записи не откатывает остальные."
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comment_view_uses_coordinator(
+        settings, user_client, post_with_published_location):
+    settings.BLOG_WRITE_COORDINATOR = True
+    post = post_with_published_location
+    try:
+        response = user_client.post(
+            f"/posts/{post.pk}/comment/", data={"text": "Через координатор"}
+        )
+        stats = writes.get_coordinator().stats
+    finally:
+        writes.shutdown()
+    assert response.status_code == HTTPStatus.FOUND
+    assert stats["writes"] == 1, (
+        "Убедитесь, что при BLOG_WRITE_COORDINATOR комментарий "
+        "записывается координатором."
+    )
+    assert Post.objects.get(pk=post.pk).comment_count == 1
+    assert user_client.get(f"/posts/{post.pk}/").content.decode().count(
+        "Через координатор"
+    ) == 1